@@ -1,32 +1,155 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, session
+from flask import Flask, render_template, jsonify, request, redirect, url_for, session, stream_with_context, g
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime, timedelta
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, date, timedelta
 from flask_cors import CORS
 from flask_migrate import Migrate
 import json
-from werkzeug.security import generate_password_hash, check_password_hash
+import click
+import base64
+import csv
+import io
+import time
+import math
+from itertools import groupby
 import os
-from functools import wraps
-from werkzeug.utils import secure_filename
+from functools import wraps, lru_cache
+from http_cache import ResponseCache
+from request_profiler import RequestProfiler, is_local_request
+from ttl_cache import TTLCache
+import sqlite_engine
+from batch_writer import BatchWriter
+from password_hasher import PasswordHasher, HasherBusy
+import user_search
+import poker_repository
+from event_stream import EventBroker
+import avatars
 
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///poker_tracker.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///poker_tracker.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = sqlite_engine.engine_options(
+    app.config['SQLALCHEMY_DATABASE_URI'],
+    pool_size=int(os.environ.get('DB_POOL_SIZE', 10)),
+    max_overflow=int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+    pool_timeout=float(os.environ.get('DB_POOL_TIMEOUT', 10))
+)
+app.config['SQLITE_PRAGMAS'] = dict(sqlite_engine.DEFAULT_PRAGMAS)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-key-change-in-production')
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
+app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+app.config['AVATAR_FOLDER'] = os.path.join(app.config['UPLOAD_FOLDER'], 'avatars')
+app.config['AVATAR_WORKERS'] = int(os.environ.get('AVATAR_WORKERS', 2))
+app.config['AVATAR_MAX_PENDING'] = 32
+app.config['PAGE_SIZE'] = 50
+app.config['MAX_PAGE_SIZE'] = 500
+app.config['STREAM_BATCH_SIZE'] = 500
+app.config['LOGIN_WRITER_BATCH_SIZE'] = 200
+app.config['LOGIN_WRITER_INTERVAL'] = 0.05  # seconds between flushes
+app.config['LOGIN_WRITER_QUEUE_SIZE'] = 10000
+app.config['BULK_CHUNK_SIZE'] = 500  # sessions per import transaction
+app.config['BULK_MAX_ERRORS'] = 1000
+# An open event stream holds a request thread for as long as the client
+# stays connected. WSGI_THREADS is the server's threads per process; streams
+# get half of them so ordinary requests keep the rest. Under gevent a
+# stream is a greenlet, so set EVENT_STREAM_MAX_CLIENTS directly instead.
+app.config['WSGI_THREADS'] = int(os.environ.get('WSGI_THREADS', 32))
+app.config['EVENT_STREAM_MAX_CLIENTS'] = int(os.environ.get('EVENT_STREAM_MAX_CLIENTS',
+                                                            max(1, app.config['WSGI_THREADS'] // 2)))
+app.config['EVENT_STREAM_HEARTBEAT'] = 15  # seconds
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+app.config['PASSWORD_HASH_MAX_PENDING'] = 32
+app.config['PASSWORD_HASH_TIMEOUT'] = 10  # seconds
+app.config['USER_CACHE_TTL'] = 30  # seconds
+app.config['USER_CACHE_SIZE'] = 1024
+app.config['SLOW_QUERY_MS'] = float(os.environ.get('SLOW_QUERY_MS', 100))
 
 db = SQLAlchemy(app)
+with app.app_context():
+    sqlite_engine.configure(db.engine, app.config['SQLITE_PRAGMAS'])
 migrate = Migrate(app, db)
 CORS(app)
+with app.app_context():
+    database_path = db.engine.url.database
+# The desktop tracker can share this database (POKER_DB); it touches a
+# marker file after each commit so cached responses see its writes too
+response_cache = ResponseCache(
+    app, db,
+    external_changes=lambda: poker_repository.change_marker(database_path) if database_path else 0
+)
+# Server-Timing headers, slow-query logging and /debug/metrics (local only)
+profiler = RequestProfiler(app, db, slow_query_ms=app.config['SLOW_QUERY_MS'])
+# Hashing is deliberately slow; keep it off the request threads' CPUs
+password_hasher = PasswordHasher(
+    method=app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    max_pending=app.config['PASSWORD_HASH_MAX_PENDING'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT']
+)
+events = EventBroker(
+    heartbeat=app.config['EVENT_STREAM_HEARTBEAT'],
+    max_clients=app.config['EVENT_STREAM_MAX_CLIENTS']
+)
 
 # Create upload folder if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+avatar_pipeline = avatars.AvatarPipeline(
+    app.config['AVATAR_FOLDER'],
+    workers=app.config['AVATAR_WORKERS'],
+    max_pending=app.config['AVATAR_MAX_PENDING']
+)
+
+@app.after_request
+def cache_avatars(response):
+    # Avatar files are named by content hash, so they never change
+    if request.path.startswith('/static/uploads/avatars/') and response.status_code == 200:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+def encode_cursor(*values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, *types):
+    # Raises ValueError unless the cursor holds exactly one value of each type
+    values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    if (not isinstance(values, list) or len(values) != len(types) or
+            not all(isinstance(value, kind) and not isinstance(value, bool) for value, kind in zip(values, types))):
+        raise ValueError('Invalid cursor')
+    return values
+
+def paginated_response(query, serialize, cursor_for):
+    # ?stream=1 writes the whole result set as one JSON array, row by row,
+    # so memory stays flat; otherwise return a single keyset page.
+    if request.args.get('stream'):
+        rows = query.yield_per(app.config['STREAM_BATCH_SIZE'])
+
+        def generate():
+            yield '['
+            for i, row in enumerate(rows):
+                yield (',' if i else '') + json.dumps(serialize(row))
+            yield ']'
+
+        return app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+    limit = request.args.get('limit', app.config['PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, app.config['MAX_PAGE_SIZE']))
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    response = jsonify([serialize(row) for row in rows])
+    if has_more:
+        next_cursor = cursor_for(rows[-1])
+        response.headers['X-Next-Cursor'] = next_cursor
+        response.headers['Link'] = '<%s>; rel="next"' % url_for(request.endpoint, cursor=next_cursor, limit=limit)
+    return response
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.String(20), unique=True, nullable=False)  # Unique player ID
@@ -44,10 +167,14 @@ class User(db.Model):
                               lazy='dynamic')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # Hashes made with an older method are upgraded on a successful login
+        matches, new_hash = password_hasher.verify(self.password_hash, password)
+        if new_hash is not None:
+            self.password_hash = new_hash
+        return matches
 
     def to_dict(self):
         return {
@@ -58,6 +185,11 @@ class User(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
+for statement in user_search.CREATE_DDL:
+    event.listen(User.__table__, 'after_create', DDL(statement))
+for statement in user_search.DROP_DDL:
+    event.listen(User.__table__, 'before_drop', DDL(statement))
+
 class LoginHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -67,6 +199,10 @@ class LoginHistory(db.Model):
     
     user = db.relationship('User', backref='login_history')
 
+    __table_args__ = (
+        db.Index('ix_login_history_user_time', 'user_id', 'login_time'),
+    )
+
 class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -89,6 +225,10 @@ class PokerSession(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_poker_session_date', 'date'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -101,17 +241,67 @@ class SessionPlayer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('poker_session.id'), nullable=False)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    total_buyins = db.Column(db.Float)  # buy-in plus rebuys; None means the session buy-in
     session = db.relationship('PokerSession', backref='players')
     player = db.relationship('Player', backref='sessions')
 
+    __table_args__ = (
+        db.Index('ix_session_player_player_session', 'player_id', 'session_id'),
+        db.Index('ix_session_player_session', 'session_id'),
+    )
+
 class PlayerResult(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     session_id = db.Column(db.Integer, db.ForeignKey('poker_session.id'), nullable=False)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
     final_amount = db.Column(db.Float, nullable=False)
+    total_buyins = db.Column(db.Float)  # buy-ins at cash-out; None means the session buy-in
     session = db.relationship('PokerSession', backref='results')
     player = db.relationship('Player', backref='results')
 
+    __table_args__ = (
+        db.Index('ix_player_result_session_player', 'session_id', 'player_id'),
+        db.Index('ix_player_result_player_session', 'player_id', 'session_id'),
+    )
+
+class PlayerDailyRollup(db.Model):
+    # One row per player per day, kept in step with PlayerResult writes so the
+    # dashboard never has to rescan sessions and results.
+    id = db.Column(db.Integer, primary_key=True)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    winning_sessions = db.Column(db.Integer, nullable=False, default=0)
+    total_profit = db.Column(db.Float, nullable=False, default=0)
+    best_profit = db.Column(db.Float)
+    worst_profit = db.Column(db.Float)
+    # Running total of total_profit over the player's days up to this one,
+    # so any range's profit is the difference of two rows
+    cumulative_profit = db.Column(db.Float, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('player_id', 'day', name='unique_player_day'),
+    )
+
+class LeaderboardEntry(db.Model):
+    # Materialized all-time totals per player, maintained alongside PlayerResult
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    total_profit = db.Column(db.Float, nullable=False, default=0, index=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    best_result = db.Column(db.Float)
+    worst_result = db.Column(db.Float)
+    player = db.relationship('Player')
+
+    def to_dict(self):
+        data = self.player.to_dict()
+        data.update({
+            'total_profit': self.total_profit,
+            'sessions': self.sessions,
+            'best_result': self.best_result,
+            'worst_result': self.worst_result
+        })
+        return data
+
 class Friendship(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -121,13 +311,243 @@ class Friendship(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'friend_id', name='unique_friendship'),
+        db.Index('ix_friendship_user_status', 'user_id', 'status'),
+        db.Index('ix_friendship_friend_status', 'friend_id', 'status'),
+    )
+
+def result_profit():
+    return PlayerResult.final_amount - db.func.coalesce(PlayerResult.total_buyins, PokerSession.buy_in_amount, 0)
+
+def daily_rollup_upsert():
+    table = PlayerDailyRollup.__table__
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=['player_id', 'day'],
+        set_={
+            'sessions': table.c.sessions + stmt.excluded.sessions,
+            'winning_sessions': table.c.winning_sessions + stmt.excluded.winning_sessions,
+            'total_profit': table.c.total_profit + stmt.excluded.total_profit,
+            'best_profit': db.func.max(table.c.best_profit, stmt.excluded.best_profit),
+            'worst_profit': db.func.min(table.c.worst_profit, stmt.excluded.worst_profit)
+        }
+    )
+
+def leaderboard_upsert():
+    table = LeaderboardEntry.__table__
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=['player_id'],
+        set_={
+            'total_profit': table.c.total_profit + stmt.excluded.total_profit,
+            'sessions': table.c.sessions + stmt.excluded.sessions,
+            'best_result': db.func.max(table.c.best_result, stmt.excluded.best_result),
+            'worst_result': db.func.min(table.c.worst_result, stmt.excluded.worst_result)
+        }
+    )
+
+def record_results(results):
+    # Fold (player_id, day, profit) tuples into the daily rollups and the
+    # leaderboard, one upsert per affected row, in the caller's transaction
+    daily = {}
+    totals = {}
+    results = list(results)
+    track_changed_players(player_id for player_id, _, _ in results)
+    for player_id, day, profit in results:
+        for key, groups in (((player_id, day), daily), (player_id, totals)):
+            group = groups.setdefault(key, {'sessions': 0, 'wins': 0, 'profit': 0, 'best': profit, 'worst': profit})
+            group['sessions'] += 1
+            group['wins'] += 1 if profit > 0 else 0
+            group['profit'] += profit
+            group['best'] = max(group['best'], profit)
+            group['worst'] = min(group['worst'], profit)
+
+    if not daily:
+        return
+    db.session.execute(daily_rollup_upsert(), [{
+        'player_id': player_id,
+        'day': day,
+        'sessions': group['sessions'],
+        'winning_sessions': group['wins'],
+        'total_profit': group['profit'],
+        'best_profit': group['best'],
+        'worst_profit': group['worst']
+    } for (player_id, day), group in daily.items()])
+    db.session.execute(leaderboard_upsert(), [{
+        'player_id': player_id,
+        'total_profit': group['profit'],
+        'sessions': group['sessions'],
+        'best_result': group['best'],
+        'worst_result': group['worst']
+    } for player_id, group in totals.items()])
+
+    starts = {}
+    for player_id, day in daily:
+        starts[player_id] = min(day, starts.get(player_id, day))
+    for day, player_ids in groupby(sorted(starts, key=starts.get), key=starts.get):
+        refresh_cumulative_profit(list(player_ids), day)
+
+def refresh_cumulative_profit(player_ids, since):
+    # Redo the running totals from ``since`` on (for every player if
+    # player_ids is None), starting from each player's last earlier day.
+    # Results usually land on the latest day, so this touches one row per player.
+    earlier = db.aliased(PlayerDailyRollup)
+    last_before = db.select(db.func.max(earlier.day)).where(
+        earlier.player_id == PlayerDailyRollup.player_id,
+        earlier.day < since
+    ).scalar_subquery()
+    base = db.session.query(PlayerDailyRollup.player_id, PlayerDailyRollup.cumulative_profit).filter(
+        PlayerDailyRollup.day == last_before
+    )
+    rows = db.session.query(PlayerDailyRollup.id, PlayerDailyRollup.player_id, PlayerDailyRollup.total_profit).filter(
+        PlayerDailyRollup.day >= since
+    )
+    if player_ids is not None:
+        base = base.filter(PlayerDailyRollup.player_id.in_(player_ids))
+        rows = rows.filter(PlayerDailyRollup.player_id.in_(player_ids))
+    base = dict(base.all())
+    rows = rows.order_by(PlayerDailyRollup.player_id, PlayerDailyRollup.day)
+
+    updates = []
+    for player_id, player_rows in groupby(rows, key=lambda row: row.player_id):
+        running = base.get(player_id, 0)
+        for row in player_rows:
+            running += row.total_profit
+            updates.append({'id': row.id, 'cumulative_profit': running})
+    if updates:
+        db.session.execute(db.update(PlayerDailyRollup), updates)
+
+def rebuild_daily_rollups(player_ids=None, day=None):
+    # Recompute rollup rows from the source tables. Min/max can't be
+    # decremented, so deletes rebuild the affected rows instead.
+    profit = result_profit()
+    row_day = db.func.date(PokerSession.date)
+    source = db.select(
+        PlayerResult.player_id,
+        row_day,
+        db.func.count(),
+        db.func.sum(db.case((profit > 0, 1), else_=0)),
+        db.func.sum(profit),
+        db.func.max(profit),
+        db.func.min(profit),
+        db.func.sum(db.func.sum(profit)).over(partition_by=PlayerResult.player_id, order_by=row_day)
+    ).join(PokerSession, PokerSession.id == PlayerResult.session_id).group_by(
+        PlayerResult.player_id, row_day
     )
+    stale = PlayerDailyRollup.query
+    if player_ids is not None:
+        source = source.filter(PlayerResult.player_id.in_(player_ids))
+        stale = stale.filter(PlayerDailyRollup.player_id.in_(player_ids))
+    if day is not None:
+        source = source.filter(row_day == day.isoformat())
+        stale = stale.filter(PlayerDailyRollup.day == day)
+
+    stale.delete(synchronize_session=False)
+    db.session.execute(db.insert(PlayerDailyRollup).from_select(
+        ['player_id', 'day', 'sessions', 'winning_sessions', 'total_profit', 'best_profit', 'worst_profit',
+         'cumulative_profit'],
+        source
+    ))
+    # A single day's rows were summed on their own; carry the change
+    # through that player's later days
+    if day is not None:
+        refresh_cumulative_profit(player_ids, day)
+
+def rebuild_leaderboard(player_ids=None):
+    profit = result_profit()
+    source = db.select(
+        PlayerResult.player_id,
+        db.func.sum(profit),
+        db.func.count(),
+        db.func.max(profit),
+        db.func.min(profit)
+    ).join(PokerSession, PokerSession.id == PlayerResult.session_id).group_by(
+        PlayerResult.player_id
+    )
+    stale = LeaderboardEntry.query
+    if player_ids is not None:
+        source = source.filter(PlayerResult.player_id.in_(player_ids))
+        stale = stale.filter(LeaderboardEntry.player_id.in_(player_ids))
+
+    stale.delete(synchronize_session=False)
+    db.session.execute(db.insert(LeaderboardEntry).from_select(
+        ['player_id', 'total_profit', 'sessions', 'best_result', 'worst_result'],
+        source
+    ))
+
+# Serialized users (User.to_dict()) by id, shared by every request in this
+# process. Commits that change a user drop its entry; the TTL covers
+# changes made by other processes.
+user_cache = TTLCache(ttl=app.config['USER_CACHE_TTL'], maxsize=app.config['USER_CACHE_SIZE'])
+
+@event.listens_for(db.session, 'after_flush')
+def track_changed_users(db_session, flush_context):
+    changed = db_session.info.setdefault('changed_users', set())
+    for obj in list(db_session.dirty) + list(db_session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+@event.listens_for(db.session, 'after_commit')
+def invalidate_changed_users(db_session):
+    changed = db_session.info.pop('changed_users', None)
+    if changed:
+        user_cache.invalidate(*changed)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_changed_users(db_session):
+    db_session.info.pop('changed_users', None)
+
+def cache_users(users):
+    # Serializes users already loaded by a query and keeps them for later requests
+    serialized = [user.to_dict() for user in users]
+    for user in serialized:
+        user_cache.put(user['id'], user)
+    return serialized
+
+def get_users(user_ids):
+    found = {}
+    for user_id in set(user_ids):
+        user = user_cache.get(user_id)
+        if user is not None:
+            found[user_id] = user
+    missing = [user_id for user_id in set(user_ids) if user_id not in found]
+    if missing:
+        for user in cache_users(User.query.filter(User.id.in_(missing))):
+            found[user['id']] = user
+    return [found[user_id] for user_id in user_ids if user_id in found]
+
+def get_user(user_id):
+    users = get_users([user_id])
+    return users[0] if users else None
+
+def write_login_history(records):
+    with app.app_context():
+        db.session.execute(db.insert(LoginHistory), records)
+        db.session.commit()
+
+# Login events are written in batches off the request thread
+login_writer = BatchWriter(
+    write_login_history,
+    batch_size=app.config['LOGIN_WRITER_BATCH_SIZE'],
+    interval=app.config['LOGIN_WRITER_INTERVAL'],
+    max_queue=app.config['LOGIN_WRITER_QUEUE_SIZE']
+)
 
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        user = get_user(session['user_id']) if 'user_id' in session else None
+        if user is None:
             return jsonify({'error': 'Authentication required'}), 401
+        g.user = user
+        return f(*args, **kwargs)
+    return decorated_function
+
+def local_only(f):
+    # Operational stats, like /debug/metrics, are for whoever runs the server
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not is_local_request():
+            return jsonify({'error': 'Not found'}), 404
         return f(*args, **kwargs)
     return decorated_function
 
@@ -135,13 +555,67 @@ def login_required(f):
 def index():
     return render_template('index.html')
 
+def leaderboard_top():
+    entries = LeaderboardEntry.query.options(db.joinedload(LeaderboardEntry.player)).order_by(
+        LeaderboardEntry.total_profit.desc()
+    ).limit(10).all()
+    return [entry.to_dict() for entry in entries]
+
 @app.route('/api/leaderboard')
+@response_cache.cached('leaderboard_entry', 'player')
 def get_leaderboard():
-    players = Player.query.order_by(Player.score.desc()).limit(10).all()
-    return jsonify([player.to_dict() for player in players])
+    return jsonify(leaderboard_top())
+
+def leaderboard_event():
+    # Runs on a stream thread; don't keep its read transaction open
+    try:
+        return leaderboard_top()
+    finally:
+        db.session.remove()
+
+@response_cache.on_change
+def publish_changes(tables):
+    if 'leaderboard_entry' in tables or 'player' in tables:
+        events.publish('leaderboard', leaderboard_event)
+
+def track_changed_players(player_ids):
+    db.session.info.setdefault('changed_players', set()).update(player_ids)
+
+@event.listens_for(db.session, 'after_commit')
+def publish_changed_players(db_session):
+    # Only the players whose results changed need to refetch their dashboard
+    for player_id in sorted(db_session.info.pop('changed_players', ())):
+        events.publish('results', user_id=player_id)
+
+@event.listens_for(db.session, 'after_rollback')
+def discard_changed_players(db_session):
+    db_session.info.pop('changed_players', None)
+
+if database_path:
+    # Writes from the desktop tracker, noticed on stream heartbeats
+    events.watch(lambda: poker_repository.change_marker(database_path), 'leaderboard', leaderboard_event)
+    # The tracker doesn't say whose results it wrote, so everyone refetches
+    events.watch(lambda: poker_repository.change_marker(database_path), 'results')
+
+@app.route('/api/events')
+def event_stream():
+    if not events.connect():
+        return jsonify({'error': 'Too many live connections'}), 503, {'Retry-After': '30'}
+    stream = events.stream(session.get('user_id'), request.headers.get('Last-Event-ID', type=int))
+    response = app.response_class(stream_with_context(stream), mimetype='text/event-stream')
+    response.call_on_close(events.disconnect)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/events/stats')
+@local_only
+def event_stats():
+    return jsonify(events.stats())
 
 @app.route('/api/sessions', methods=['GET', 'POST'])
 @login_required
+@response_cache.cached('poker_session')
 def sessions():
     if request.method == 'POST':
         data = request.json
@@ -154,10 +628,261 @@ def sessions():
         db.session.commit()
         return jsonify(session.to_dict())
     else:
-        sessions = PokerSession.query.order_by(PokerSession.date.desc()).all()
-        return jsonify([session.to_dict() for session in sessions])
+        query = PokerSession.query.order_by(PokerSession.date.desc(), PokerSession.id.desc())
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_date, cursor_id = decode_cursor(cursor, str, int)
+                cursor_date = datetime.fromisoformat(cursor_date)
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.filter(db.tuple_(PokerSession.date, PokerSession.id) < (cursor_date, cursor_id))
+        return paginated_response(
+            query,
+            lambda session: session.to_dict(),
+            lambda session: encode_cursor(session.date.isoformat(), session.id)
+        )
+
+BULK_CSV_FIELDS = ['session_ref', 'date', 'buy_in_amount', 'notes', 'player_id', 'final_amount']
+
+def parse_amount(value):
+    # float() also accepts "NaN" and "inf", which the aggregates can't hold
+    if value in (None, ''):
+        return None
+    amount = float(value)
+    if not math.isfinite(amount):
+        raise ValueError(value)
+    return amount
+
+def parse_bulk_session(record):
+    # Validate one imported session; raises ValueError with a message
+    # suitable for the per-row error report
+    if isinstance(record, Exception):
+        raise ValueError(f'Invalid record: {record}')
+    if not isinstance(record, dict):
+        raise ValueError('Expected a JSON object')
+    try:
+        session_date = datetime.strptime(record['date'], '%Y-%m-%d')
+    except KeyError:
+        raise ValueError('Missing date')
+    except (TypeError, ValueError):
+        raise ValueError('Invalid date, expected YYYY-MM-DD')
+
+    try:
+        buy_in = parse_amount(record.get('buy_in_amount'))
+        results = []
+        for entry in record.get('players') or []:
+            results.append((int(entry['player_id']), parse_amount(entry.get('final_amount'))))
+    except KeyError:
+        raise ValueError('Missing player_id')
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError('Invalid buy_in_amount, player_id or final_amount')
+
+    seen = set()
+    for player_id, _ in results:
+        if player_id in seen:
+            raise ValueError(f'Duplicate player_id {player_id}')
+        seen.add(player_id)
+
+    return {
+        'date': session_date,
+        'buy_in_amount': buy_in,
+        'notes': record.get('notes') or None
+    }, results
+
+def read_bulk_ndjson(stream):
+    for line_number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8'), 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, e
+
+def read_bulk_csv(stream):
+    # One row per player; consecutive rows sharing a session_ref form a session
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    for session_ref, rows in groupby(reader, key=lambda row: row.get('session_ref')):
+        first = next(rows)
+        record = {
+            'date': first.get('date'),
+            'buy_in_amount': first.get('buy_in_amount'),
+            'notes': first.get('notes'),
+            'players': []
+        }
+        line_number = reader.line_num
+        for row in [first] + list(rows):
+            if row.get('player_id'):
+                record['players'].append({'player_id': row['player_id'], 'final_amount': row.get('final_amount')})
+        yield line_number, record
+
+def import_session_chunk(chunk):
+    # Insert a chunk of parsed sessions in one transaction with executemany.
+    # Returns (sessions, results, errors).
+    player_ids = {player_id for _, _, results in chunk for player_id, _ in results}
+    known = {player_id for player_id, in db.session.query(Player.id).filter(Player.id.in_(player_ids))}
+
+    errors = []
+    valid = []
+    for line_number, session_row, results in chunk:
+        unknown = sorted({player_id for player_id, _ in results} - known)
+        if unknown:
+            errors.append({'line': line_number, 'error': f'Unknown player_id {unknown[0]}'})
+        else:
+            valid.append((line_number, session_row, results))
+    if not valid:
+        return 0, 0, errors
+
+    try:
+        session_ids = db.session.execute(
+            db.insert(PokerSession).returning(PokerSession.id, sort_by_parameter_order=True),
+            [session_row for _, session_row, _ in valid]
+        ).scalars().all()
+
+        seats = []
+        result_rows = []
+        profits = []
+        for session_id, (_, session_row, results) in zip(session_ids, valid):
+            for player_id, final_amount in results:
+                seats.append({'session_id': session_id, 'player_id': player_id})
+                if final_amount is not None:
+                    result_rows.append({'session_id': session_id, 'player_id': player_id, 'final_amount': final_amount})
+                    profits.append((
+                        player_id,
+                        session_row['date'].date(),
+                        final_amount - (session_row['buy_in_amount'] or 0)
+                    ))
+        if seats:
+            db.session.execute(db.insert(SessionPlayer), seats)
+        if result_rows:
+            db.session.execute(db.insert(PlayerResult), result_rows)
+        record_results(profits)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        app.logger.exception('Bulk import chunk failed')
+        # Lines already rejected above keep their own error
+        return 0, 0, errors + [{'line': line_number, 'error': f'Database error: {e.__class__.__name__}'}
+                               for line_number, _, _ in valid]
+
+    return len(session_ids), len(result_rows), errors
+
+@app.route('/api/sessions/bulk', methods=['POST'])
+@login_required
+def import_sessions():
+    if request.mimetype == 'text/csv':
+        records = read_bulk_csv(request.stream)
+    else:
+        records = read_bulk_ndjson(request.stream)
+
+    started = time.perf_counter()
+    imported_sessions = 0
+    imported_results = 0
+    errors = []
+    chunk = []
+
+    def flush():
+        nonlocal imported_sessions, imported_results
+        sessions_added, results_added, chunk_errors = import_session_chunk(chunk)
+        imported_sessions += sessions_added
+        imported_results += results_added
+        errors.extend(chunk_errors)
+        chunk.clear()
+
+    for line_number, record in records:
+        try:
+            session_row, results = parse_bulk_session(record)
+        except ValueError as e:
+            errors.append({'line': line_number, 'error': str(e)})
+            continue
+        chunk.append((line_number, session_row, results))
+        if len(chunk) >= app.config['BULK_CHUNK_SIZE']:
+            flush()
+    if chunk:
+        flush()
+
+    elapsed = time.perf_counter() - started
+    errors.sort(key=lambda error: error['line'])
+    return jsonify({
+        'imported_sessions': imported_sessions,
+        'imported_results': imported_results,
+        'error_count': len(errors),
+        'errors': errors[:app.config['BULK_MAX_ERRORS']],
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round((imported_sessions + imported_results) / elapsed, 1) if elapsed > 0 else 0
+    })
+
+@app.route('/api/sessions/bulk', methods=['GET'])
+@login_required
+def export_sessions():
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'Unsupported format'}), 400
+
+    # Every seat, with its result if there is one, plus results recorded
+    # without a seat, so an export re-imports as the same sessions
+    seats = db.select(
+        SessionPlayer.session_id,
+        SessionPlayer.player_id,
+        PlayerResult.final_amount
+    ).outerjoin(
+        PlayerResult,
+        (PlayerResult.session_id == SessionPlayer.session_id) &
+        (PlayerResult.player_id == SessionPlayer.player_id)
+    )
+    seatless = db.select(
+        PlayerResult.session_id,
+        PlayerResult.player_id,
+        PlayerResult.final_amount
+    ).where(~db.exists().where(
+        (SessionPlayer.session_id == PlayerResult.session_id) &
+        (SessionPlayer.player_id == PlayerResult.player_id)
+    ))
+    members = db.union_all(seats, seatless).subquery()
+    rows = db.session.query(
+        PokerSession.id,
+        PokerSession.date,
+        PokerSession.buy_in_amount,
+        PokerSession.notes,
+        members.c.player_id,
+        members.c.final_amount
+    ).outerjoin(members, members.c.session_id == PokerSession.id).order_by(
+        PokerSession.id, members.c.player_id
+    ).yield_per(app.config['STREAM_BATCH_SIZE'])
+    sessions = groupby(rows, key=lambda row: row.id)
+
+    def generate_ndjson():
+        for _, results in sessions:
+            results = list(results)
+            first = results[0]
+            yield json.dumps({
+                'date': first.date.strftime('%Y-%m-%d'),
+                'buy_in_amount': first.buy_in_amount,
+                'notes': first.notes,
+                'players': [{
+                    'player_id': row.player_id,
+                    'final_amount': row.final_amount
+                } for row in results if row.player_id is not None]
+            }) + '\n'
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(BULK_CSV_FIELDS)
+        for session_id, results in sessions:
+            for row in results:
+                writer.writerow([session_id, row.date.strftime('%Y-%m-%d'), row.buy_in_amount,
+                                 row.notes, row.player_id, row.final_amount])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if export_format == 'csv':
+        return app.response_class(stream_with_context(generate_csv()), mimetype='text/csv')
+    return app.response_class(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
 
 @app.route('/api/players', methods=['GET', 'POST'])
+@response_cache.cached('player')
 def players():
     if request.method == 'POST':
         data = request.json
@@ -169,12 +894,27 @@ def players():
         db.session.commit()
         return jsonify(player.to_dict())
     else:
-        players = Player.query.all()
-        return jsonify([player.to_dict() for player in players])
+        query = Player.query.order_by(Player.id)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_id, = decode_cursor(cursor, int)
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.filter(Player.id > cursor_id)
+        return paginated_response(
+            query,
+            lambda player: player.to_dict(),
+            lambda player: encode_cursor(player.id)
+        )
 
 @app.route('/api/session/<int:session_id>/results', methods=['GET', 'POST'])
 def session_results(session_id):
     if request.method == 'POST':
+        poker_session = PokerSession.query.get(session_id)
+        if not poker_session:
+            return jsonify({'error': 'Session not found'}), 404
+
         data = request.json
         result = PlayerResult(
             session_id=session_id,
@@ -182,6 +922,8 @@ def session_results(session_id):
             final_amount=data['final_amount']
         )
         db.session.add(result)
+        profit = result.final_amount - (poker_session.buy_in_amount or 0)
+        record_results([(result.player_id, poker_session.date.date(), profit)])
         db.session.commit()
         return jsonify({'status': 'success'})
     else:
@@ -206,7 +948,10 @@ def register():
         username=data['username'],
         avatar=data.get('avatar', 'default.png')
     )
-    user.set_password(data['password'])
+    try:
+        user.set_password(data['password'])
+    except HasherBusy:
+        return jsonify({'error': 'Server is busy, try again shortly'}), 503, {'Retry-After': '1'}
     
     try:
         db.session.add(user)
@@ -226,17 +971,24 @@ def login():
     
     user = User.query.filter_by(username=data['username']).first()
     
-    if user and user.check_password(data['password']):
+    try:
+        authenticated = user is not None and user.check_password(data['password'])
+    except HasherBusy:
+        return jsonify({'error': 'Server is busy, try again shortly'}), 503, {'Retry-After': '1'}
+    
+    if authenticated:
         session['user_id'] = user.id
+        if db.session.is_modified(user):
+            db.session.commit()
+        cache_users([user])
         
         # Record login history
-        login_record = LoginHistory(
-            user_id=user.id,
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent')
-        )
-        db.session.add(login_record)
-        db.session.commit()
+        login_writer.submit({
+            'user_id': user.id,
+            'login_time': datetime.utcnow(),
+            'ip_address': request.remote_addr,
+            'user_agent': request.headers.get('User-Agent')
+        })
         
         return jsonify(user.to_dict()), 200
     
@@ -251,17 +1003,41 @@ def logout():
 def check_auth():
     user_id = session.get('user_id')
     if user_id:
-        user = User.query.get(user_id)
+        user = get_user(user_id)
         if user:
-            return jsonify(user.to_dict()), 200
+            return jsonify(user), 200
     return jsonify({'error': 'Not authenticated'}), 401
 
+@app.route('/api/cache/stats')
+@local_only
+def cache_stats():
+    stats = response_cache.stats()
+    stats['users'] = user_cache.stats()
+    return jsonify(stats)
+
+@app.route('/api/db/stats')
+@local_only
+def db_stats():
+    stats = sqlite_engine.pool_stats(db.engine)
+    stats['login_writer'] = login_writer.stats()
+    stats['password_hasher'] = password_hasher.stats()
+    return jsonify(stats)
+
 @app.route('/api/sessions/<int:session_id>', methods=['DELETE'])
 @login_required
 def delete_session(session_id):
     session = PokerSession.query.get(session_id)
     if session:
+        player_ids = [player_id for player_id, in db.session.query(PlayerResult.player_id).filter_by(
+            session_id=session_id
+        ).distinct()]
+        PlayerResult.query.filter_by(session_id=session_id).delete(synchronize_session=False)
+        SessionPlayer.query.filter_by(session_id=session_id).delete(synchronize_session=False)
         db.session.delete(session)
+        if player_ids:
+            rebuild_daily_rollups(player_ids, session.date.date())
+            rebuild_leaderboard(player_ids)
+            track_changed_players(player_ids)
         db.session.commit()
         return jsonify({'message': 'Session deleted successfully'}), 200
     else:
@@ -283,93 +1059,268 @@ def upload_avatar():
         return jsonify({'error': 'No selected file'}), 400
     
     if file and allowed_file(file.filename):
-        filename = secure_filename(f"{session['user_id']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-        file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+        data = file.read()
+        try:
+            avatars.inspect(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Update user's avatar in database
-        user = User.query.get(session['user_id'])
-        if user:
-            # Delete old avatar if exists
-            if user.avatar and os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], user.avatar)):
-                os.remove(os.path.join(app.config['UPLOAD_FOLDER'], user.avatar))
-            
-            user.avatar = filename
-            db.session.commit()
-            
-            return jsonify({'avatar': filename}), 200
+        digest = avatars.content_hash(data)
+        sizes = {size: avatar_path(digest, size) for size in avatars.SIZES}
+        filename = sizes[avatars.SIZES[0]]
+        
+        user_id = g.user['id']
+        # Same image already processed (by anyone): nothing to decode
+        if avatar_pipeline.stored(digest):
+            set_avatar(user_id, filename)
+            return jsonify({'avatar': filename, 'sizes': sizes}), 200
+        
+        if not avatar_pipeline.submit(data, digest, lambda: set_avatar(user_id, filename),
+                                      lambda: avatar_failed(user_id)):
+            return jsonify({'error': 'Too many uploads in progress, try again shortly'}), 503, {'Retry-After': '5'}
+        return jsonify({'avatar': filename, 'sizes': sizes, 'status': 'processing'}), 202
     
     return jsonify({'error': 'Invalid file type'}), 400
 
+def avatar_path(digest, size):
+    # Relative to UPLOAD_FOLDER, like the avatar column always was
+    return f'avatars/{avatars.filename(digest, size)}'
+
+def set_avatar(user_id, filename):
+    # Called from the request or from an avatar worker thread
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        if not user:
+            return
+        old_avatar = user.avatar
+        user.avatar = filename
+        db.session.commit()
+    
+    # Content-addressed files may be shared, so only old per-upload files are removed
+    if old_avatar and old_avatar != filename and not old_avatar.startswith('avatars/'):
+        old_path = os.path.join(app.config['UPLOAD_FOLDER'], old_avatar)
+        if os.path.exists(old_path):
+            os.remove(old_path)
+    events.publish('avatar', {'avatar': filename}, user_id=user_id)
+
+def avatar_failed(user_id):
+    # The upload was answered with a 202; this is the only word the client gets
+    events.publish('avatar', {'error': 'The image could not be processed'}, user_id=user_id)
+
+@app.route('/api/profile/avatar/stats')
+@local_only
+def avatar_stats():
+    return jsonify(avatar_pipeline.stats())
+
+def compute_player_stats(player_id, recent_limit=10):
+    # Totals are window aggregates over every session the player sat in, so
+    # the recent-session page and the summary come back in a single query.
+    profit = result_profit().label('profit')
+    rows = db.session.query(
+        PokerSession.date,
+        PokerSession.buy_in_amount,
+        PokerSession.notes,
+        profit,
+        db.func.count().over().label('total_sessions'),
+        db.func.count(PlayerResult.id).over().label('played_sessions'),
+        db.func.coalesce(db.func.sum(profit).over(), 0).label('total_profit'),
+        db.func.sum(db.case((profit > 0, 1), else_=0)).over().label('winning_sessions')
+    ).select_from(SessionPlayer).join(
+        PokerSession, PokerSession.id == SessionPlayer.session_id
+    ).outerjoin(
+        PlayerResult,
+        (PlayerResult.session_id == SessionPlayer.session_id) &
+        (PlayerResult.player_id == SessionPlayer.player_id)
+    ).filter(
+        SessionPlayer.player_id == player_id
+    ).order_by(
+        PlayerResult.id.is_(None), PokerSession.date.desc(), PokerSession.id.desc()
+    ).limit(recent_limit).all()
+
+    if not rows:
+        return {
+            'total_sessions': 0,
+            'total_profit': 0,
+            'win_rate': 0,
+            'recent_sessions': []
+        }
+
+    totals = rows[0]
+    # Sessions without a recorded result can't be won or lost yet
+    win_rate = (totals.winning_sessions / totals.played_sessions * 100) if totals.played_sessions > 0 else 0
+
+    return {
+        'total_sessions': totals.total_sessions,
+        'total_profit': totals.total_profit,
+        'win_rate': round(win_rate, 1),
+        'recent_sessions': [{
+            'date': row.date.strftime('%Y-%m-%d'),
+            'buy_in_amount': row.buy_in_amount,
+            'profit_loss': row.profit,
+            'notes': row.notes
+        } for row in rows if row.profit is not None]
+    }
+
 @app.route('/api/profile/stats/<int:user_id>')
 @login_required
+@response_cache.cached('session_player', 'poker_session', 'player_result')
 def get_user_stats(user_id):
-    # Get user's sessions
-    sessions = PokerSession.query.join(SessionPlayer).join(Player).filter(Player.id == user_id).all()
-    
-    # Calculate statistics
-    total_sessions = len(sessions)
-    total_profit = 0
-    winning_sessions = 0
-    
-    recent_sessions = []
-    for session in sessions[:10]:  # Get last 10 sessions
-        result = PlayerResult.query.filter_by(session_id=session.id, player_id=user_id).first()
-        if result:
-            profit_loss = result.final_amount - session.buy_in_amount
-            total_profit += profit_loss
-            if profit_loss > 0:
-                winning_sessions += 1
-            
-            recent_sessions.append({
-                'date': session.date.strftime('%Y-%m-%d'),
-                'buy_in_amount': session.buy_in_amount,
-                'profit_loss': profit_loss,
-                'notes': session.notes
-            })
-    
-    win_rate = (winning_sessions / total_sessions * 100) if total_sessions > 0 else 0
+    return jsonify(compute_player_stats(user_id))
+
+def series_resolution(start, end):
+    # Keep charts to roughly a hundred points whatever the range
+    span = (end - start).days
+    if span <= 92:
+        return 'day'
+    if span <= 731:
+        return 'week'
+    return 'month'
+
+def series_buckets(start, end, resolution):
+    # (label, last day) for every week (from Monday) or month overlapping the range
+    buckets = []
+    if resolution == 'week':
+        first = start - timedelta(days=start.weekday())
+        while first <= end:
+            buckets.append((first.isoformat(), min(first + timedelta(days=6), end)))
+            first += timedelta(days=7)
+    else:
+        first = start.replace(day=1)
+        while first <= end:
+            next_month = (first + timedelta(days=32)).replace(day=1)
+            buckets.append((first.strftime('%Y-%m'), min(next_month - timedelta(days=1), end)))
+            first = next_month
+    return buckets
+
+def cumulative_profit_at(player_id, days):
+    # The running total as of each day, in one statement: an index seek
+    # on (player_id, day) per requested day, however long the history
+    bounds = db.func.json_each(json.dumps([day.isoformat() for day in days])).table_valued('key', 'value')
+    latest = db.select(PlayerDailyRollup.cumulative_profit).where(
+        PlayerDailyRollup.player_id == player_id,
+        PlayerDailyRollup.day <= bounds.c.value
+    ).order_by(PlayerDailyRollup.day.desc()).limit(1).scalar_subquery()
+    return [total for total, in db.session.execute(
+        db.select(db.func.coalesce(latest, 0)).select_from(bounds).order_by(bounds.c.key)
+    )]
+
+def daily_profit_series(rollups):
+    # Rollup rows in day order; cumulative is relative to the first day
+    base = rollups[0].cumulative_profit - rollups[0].total_profit if rollups else 0
+    return {
+        'resolution': 'day',
+        'labels': [r.day.strftime('%Y-%m-%d') for r in rollups],
+        'data': [r.total_profit for r in rollups],
+        'cumulative': [round(r.cumulative_profit - base, 2) for r in rollups]
+    }
+
+def profit_series(player_id, start, end, resolution=None):
+    resolution = resolution or series_resolution(start, end)
+    if resolution == 'day':
+        return daily_profit_series(PlayerDailyRollup.query.filter(
+            PlayerDailyRollup.player_id == player_id,
+            PlayerDailyRollup.day.between(start, end)
+        ).order_by(PlayerDailyRollup.day).all())
+
+    # A bucket's profit is the running total at its end minus the one
+    # at the previous bucket's end
+    buckets = series_buckets(start, end, resolution)
+    totals = cumulative_profit_at(player_id, [start - timedelta(days=1)] + [last for _, last in buckets])
+    return {
+        'resolution': resolution,
+        'labels': [label for label, _ in buckets],
+        'data': [round(total - previous, 2) for previous, total in zip(totals, totals[1:])],
+        'cumulative': [round(total - totals[0], 2) for total in totals[1:]]
+    }
+
+@app.route('/api/profile/profit-series')
+@login_required
+@response_cache.cached('player_daily_rollup', daily=True)
+def get_profit_series():
+    try:
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if 'end' in request.args else date.today()
+        start = (datetime.strptime(request.args['start'], '%Y-%m-%d').date() if 'start' in request.args
+                 else end - timedelta(days=364))
+    except ValueError:
+        return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+    if start > end:
+        return jsonify({'error': 'start must not be after end'}), 400
+    resolution = request.args.get('resolution')
+    if resolution not in (None, 'day', 'week', 'month'):
+        return jsonify({'error': 'resolution must be day, week or month'}), 400
     
+    return jsonify(profit_series(session['user_id'], start, end, resolution))
+
+@app.route('/api/dashboard')
+@login_required
+@response_cache.cached('player_daily_rollup', 'poker_session', 'player_result', daily=True)
+def get_dashboard():
+    player_id = session['user_id']
+    days = request.args.get('days', type=int)
+
+    rollups = PlayerDailyRollup.query.filter_by(player_id=player_id)
+    recent = db.session.query(
+        PokerSession.date,
+        result_profit().label('profit')
+    ).join(PlayerResult, PlayerResult.session_id == PokerSession.id).filter(
+        PlayerResult.player_id == player_id
+    )
+    if days and days > 0:
+        since = date.today() - timedelta(days=days - 1)
+        rollups = rollups.filter(PlayerDailyRollup.day >= since)
+        recent = recent.filter(PokerSession.date >= datetime.combine(since, datetime.min.time()))
+
+    rollups = rollups.order_by(PlayerDailyRollup.day).all()
+    recent = recent.order_by(PokerSession.date.desc(), PokerSession.id.desc()).limit(10).all()
+
+    # Short ranges chart the rows already loaded; long ones are bucketed
+    chart = daily_profit_series(rollups)
+    if rollups and series_resolution(rollups[0].day, rollups[-1].day) != 'day':
+        chart = profit_series(player_id, rollups[0].day, rollups[-1].day)
+
+    total_sessions = sum(r.sessions for r in rollups)
+    winning_sessions = sum(r.winning_sessions for r in rollups)
+    total_profit = sum(r.total_profit for r in rollups)
+
     return jsonify({
         'total_sessions': total_sessions,
-        'total_profit': total_profit,
-        'win_rate': round(win_rate, 1),
-        'recent_sessions': recent_sessions
+        'win_rate': round(winning_sessions / total_sessions * 100, 1) if total_sessions > 0 else 0,
+        'total_profit': round(total_profit, 2),
+        'best_session': max((r.best_profit for r in rollups), default=0),
+        'worst_session': min((r.worst_profit for r in rollups), default=0),
+        'avg_profit': round(total_profit / total_sessions, 2) if total_sessions > 0 else 0,
+        'recent_sessions': [{
+            'date': row.date.strftime('%Y-%m-%d'),
+            'profit_loss': row.profit
+        } for row in recent],
+        'profit_chart': chart
     })
 
 @app.route('/api/friends', methods=['GET'])
 @login_required
+@response_cache.cached('friendship', 'user')
 def get_friends():
     user_id = session['user_id']
-    friendships = Friendship.query.filter(
-        (Friendship.user_id == user_id) | (Friendship.friend_id == user_id),
+    friends = User.query.join(Friendship, db.or_(
+        (Friendship.user_id == user_id) & (Friendship.friend_id == User.id),
+        (Friendship.friend_id == user_id) & (Friendship.user_id == User.id)
+    )).filter(
         Friendship.status == 'accepted'
     ).all()
     
-    friends = []
-    for friendship in friendships:
-        friend_id = friendship.friend_id if friendship.user_id == user_id else friendship.user_id
-        friend = User.query.get(friend_id)
-        if friend:
-            friends.append(friend.to_dict())
-    
-    return jsonify(friends)
+    return jsonify(cache_users(friends))
 
 @app.route('/api/friends/pending', methods=['GET'])
 @login_required
+@response_cache.cached('friendship', 'user')
 def get_pending_friends():
     user_id = session['user_id']
-    pending_friendships = Friendship.query.filter(
+    pending_friends = User.query.join(Friendship, Friendship.user_id == User.id).filter(
         Friendship.friend_id == user_id,
         Friendship.status == 'pending'
     ).all()
     
-    pending_friends = []
-    for friendship in pending_friendships:
-        friend = User.query.get(friendship.user_id)
-        if friend:
-            pending_friends.append(friend.to_dict())
-    
-    return jsonify(pending_friends)
+    return jsonify(cache_users(pending_friends))
 
 @app.route('/api/friends/add', methods=['POST'])
 @login_required
@@ -380,26 +1331,26 @@ def add_friend():
     if not friend_player_id:
         return jsonify({'error': 'Player ID is required'}), 400
     
-    friend = User.query.filter_by(player_id=friend_player_id).first()
-    if not friend:
+    user_id = session['user_id']
+    # Look up the target user and any existing friendship in one query
+    row = db.session.query(User, Friendship.id).outerjoin(Friendship, db.or_(
+        (Friendship.user_id == user_id) & (Friendship.friend_id == User.id),
+        (Friendship.user_id == User.id) & (Friendship.friend_id == user_id)
+    )).filter(User.player_id == friend_player_id).first()
+    if not row:
         return jsonify({'error': 'User not found'}), 404
     
-    user_id = session['user_id']
+    friend, existing_friendship = row
     if user_id == friend.id:
         return jsonify({'error': 'Cannot add yourself as a friend'}), 400
     
-    # Check if friendship already exists
-    existing_friendship = Friendship.query.filter(
-        ((Friendship.user_id == user_id) & (Friendship.friend_id == friend.id)) |
-        ((Friendship.user_id == friend.id) & (Friendship.friend_id == user_id))
-    ).first()
-    
     if existing_friendship:
         return jsonify({'error': 'Friendship already exists'}), 400
     
     friendship = Friendship(user_id=user_id, friend_id=friend.id)
     db.session.add(friendship)
     db.session.commit()
+    events.publish('friend_request', user_id=friend.id)
     
     return jsonify({'message': 'Friend request sent'}), 201
 
@@ -418,6 +1369,7 @@ def accept_friend(friend_id):
     
     friendship.status = 'accepted'
     db.session.commit()
+    events.publish('friends', user_id=friend_id)
     
     return jsonify({'message': 'Friend request accepted'}), 200
 
@@ -439,25 +1391,62 @@ def reject_friend(friend_id):
     
     return jsonify({'message': 'Friend request rejected'}), 200
 
+def prefix_matches(query, limit):
+    low, high = user_search.prefix_range(query)
+    return tuple(row[0] for row in db.session.execute(db.text(user_search.PREFIX_SQL), {
+        'low': low,
+        'high': high,
+        'limit': limit
+    }))
+
+@lru_cache(maxsize=1024)
+def short_prefix_matches(prefix, version):
+    # Keyed on the user table version so signups and renames invalidate it
+    return prefix_matches(prefix, 11)
+
 @app.route('/api/users/search', methods=['GET'])
 @login_required
 def search_users():
-    query = request.args.get('query', '')
+    query = request.args.get('query', '').strip()
     if not query:
         return jsonify([])
-        
-    # Search for users by username, excluding the current user
-    users = User.query.filter(
-        User.username.ilike(f'%{query}%'),
-        User.id != session['user_id']
-    ).limit(10).all()
+    
+    # Search for users by username, excluding the current user. Prefix
+    # matches rank first, then substring matches from the trigram index.
+    user_id = session['user_id']
+    if len(query) < user_search.MIN_MATCH_LENGTH:
+        version = response_cache.versions.get('user', 0)
+        matches = short_prefix_matches(user_search.ascii_lower(query), version)
+    else:
+        matches = prefix_matches(query, 11) + tuple(row[0] for row in db.session.execute(
+            db.text(user_search.MATCH_SQL), {
+                'match': user_search.match_expression(query),
+                'exclude': user_id,
+                'limit': 11
+            }
+        ))
+    user_ids = []
+    for match in matches:
+        if match != user_id and match not in user_ids:
+            user_ids.append(match)
+    user_ids = user_ids[:10]
+    users = get_users(user_ids)
     
     return jsonify([{
-        'player_id': user.player_id,
-        'username': user.username,
-        'avatar': user.avatar
+        'player_id': user['player_id'],
+        'username': user['username'],
+        'avatar': user['avatar']
     } for user in users])
 
+@app.cli.command('import-desktop-data')
+@click.argument('data_file', default='poker_data.json')
+def import_desktop_data(data_file):
+    """Copy the desktop tracker's JSON history into this database."""
+    sessions, results = poker_repository.migrate_json(data_file, database_path)
+    response_cache.bump('player', 'poker_session', 'session_player', 'player_result',
+                        'player_daily_rollup', 'leaderboard_entry')
+    click.echo(f'Imported {sessions} sessions and {results} results from {data_file}')
+
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
@@ -0,0 +1,140 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# Largest first: the smaller sizes are scaled from the largest thumbnail
+SIZES = (256, 64)
+MAX_PIXELS = 40_000_000
+ALLOWED_FORMATS = {'PNG', 'JPEG', 'GIF', 'WEBP'}
+
+if features.check('webp'):
+    FORMAT, EXTENSION, SAVE_OPTIONS = 'WEBP', 'webp', {'quality': 80, 'method': 4}
+else:
+    FORMAT, EXTENSION, SAVE_OPTIONS = 'JPEG', 'jpg', {'quality': 85, 'optimize': True}
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def filename(digest, size):
+    return f'{digest}-{size}.{EXTENSION}'
+
+
+def inspect(data):
+    """Read just the image header; raises ValueError for anything we won't decode."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format, (width, height) = image.format, image.size
+    except (OSError, Image.DecompressionBombError):
+        raise ValueError('File is not a valid image')
+    if image_format not in ALLOWED_FORMATS:
+        raise ValueError('Unsupported image format')
+    if width * height > MAX_PIXELS:
+        raise ValueError('Image dimensions are too large')
+
+
+def render(data, directory, digest):
+    """Decode once, crop to a square and write every size; returns the names."""
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEGs are decoded at a reduced scale when that's still big enough
+        image.draft('RGB', (SIZES[0] * 2, SIZES[0] * 2))
+        image = ImageOps.exif_transpose(image)
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha and FORMAT == 'WEBP' else 'RGB')
+    thumbnail = ImageOps.fit(image, (SIZES[0], SIZES[0]), Image.LANCZOS)
+
+    names = {}
+    for size in SIZES:
+        if size != SIZES[0]:
+            thumbnail = thumbnail.resize((size, size), Image.LANCZOS)
+        name = filename(digest, size)
+        path = os.path.join(directory, name)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        thumbnail.save(temp_path, FORMAT, **SAVE_OPTIONS)
+        os.replace(temp_path, path)
+        names[size] = name
+    return names
+
+
+def _finished(on_done, on_error):
+    def callback(future):
+        if future.exception() is None:
+            on_done()
+        elif on_error is not None:
+            on_error()
+    return callback
+
+
+class AvatarPipeline:
+    """Turns uploads into content-addressed thumbnails on a worker pool.
+
+    Pillow releases the GIL while decoding, resizing and encoding, so a
+    small thread pool works in parallel without copying uploads to other
+    processes. At most ``max_pending`` uploads wait at once, and the same
+    image uploaded twice is only processed once.
+    """
+
+    def __init__(self, directory, workers=2, max_pending=32):
+        self.directory = directory
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='avatar')
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.processed = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.failed = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def stored(self, digest):
+        return all(os.path.exists(os.path.join(self.directory, filename(digest, size))) for size in SIZES)
+
+    def submit(self, data, digest, on_done, on_error=None):
+        """Queue ``data`` for processing and call ``on_done()`` from the
+        worker once stored, or ``on_error()`` if it couldn't be processed.
+        Returns False when the queue is full."""
+        with self.lock:
+            if digest in self.in_flight:
+                self.deduplicated += 1
+                self.in_flight[digest].add_done_callback(_finished(on_done, on_error))
+                return True
+            if len(self.in_flight) >= self.max_pending:
+                self.rejected += 1
+                return False
+            future = self.executor.submit(self._process, data, digest)
+            self.in_flight[digest] = future
+        future.add_done_callback(_finished(on_done, on_error))
+        return True
+
+    def _process(self, data, digest):
+        try:
+            render(data, self.directory, digest)
+        except Exception:
+            logger.exception('Failed to process avatar %s', digest)
+            with self.lock:
+                self.failed += 1
+            raise
+        else:
+            with self.lock:
+                self.processed += 1
+        finally:
+            with self.lock:
+                self.in_flight.pop(digest, None)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pending': len(self.in_flight),
+                'processed': self.processed,
+                'deduplicated': self.deduplicated,
+                'rejected': self.rejected,
+                'failed': self.failed
+            }
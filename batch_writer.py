@@ -0,0 +1,118 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """Queue records in memory and write them from a background thread.
+
+    ``flush`` is called with a list of records every ``interval`` seconds
+    or as soon as ``batch_size`` records are waiting. The queue is
+    bounded: when it is full, ``submit`` waits up to ``put_timeout``
+    seconds (backpressure) and then drops the record. Once ``stop`` has
+    been called, ``submit`` rejects records until ``start`` is called again.
+    """
+
+    def __init__(self, flush, batch_size=100, interval=0.05, max_queue=10000, put_timeout=0.05):
+        self.flush_batch = flush
+        self.batch_size = batch_size
+        self.interval = interval
+        self.put_timeout = put_timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.counters = {
+            'submitted': 0,
+            'written': 0,
+            'batches': 0,
+            'backpressure': 0,
+            'dropped': 0,
+            'rejected': 0,
+            'failed': 0,
+        }
+        atexit.register(self.stop)
+
+    def _count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.stopping.clear()
+                self.thread = threading.Thread(target=self._run, name='batch-writer', daemon=True)
+                self.thread.start()
+
+    def submit(self, record):
+        if self.stopping.is_set():
+            # Nothing would write it any more
+            self._count('rejected')
+            return False
+        if self.thread is None or not self.thread.is_alive():
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._count('backpressure')
+            try:
+                self.queue.put(record, timeout=self.put_timeout)
+            except queue.Full:
+                self._count('dropped')
+                return False
+        self._count('submitted')
+        return True
+
+    def _take_batch(self, timeout):
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.queue.get(timeout=remaining))
+                else:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            self.flush_batch(batch)
+        except Exception:
+            logger.exception('Failed to write %d queued records', len(batch))
+            self._count('failed', len(batch))
+        else:
+            self._count('written', len(batch))
+            self._count('batches')
+
+    def _run(self):
+        while not self.stopping.is_set():
+            batch = self._take_batch(self.interval)
+            if batch:
+                self._write(batch)
+        self.drain()
+
+    def drain(self):
+        while True:
+            batch = self._take_batch(0)
+            if not batch:
+                return
+            self._write(batch)
+
+    def stop(self, timeout=5):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+        self.drain()
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        stats['queued'] = self.queue.qsize()
+        return stats
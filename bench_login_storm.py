@@ -0,0 +1,152 @@
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PASSWORD = 'bench-password'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Dashboard latency while a storm of logins runs, with hashing inline and on the process pool.')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--login-threads', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=2, help='hashing processes for the pooled run')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per phase')
+    parser.add_argument('--method', default='scrypt', help='werkzeug hash method')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def request(port, method, path, body=None, cookie=None):
+    headers = {}
+    if body is not None:
+        headers['Content-Type'] = 'application/json'
+    if cookie:
+        headers['Cookie'] = cookie
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    started = time.perf_counter()
+    conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response, time.perf_counter() - started
+
+
+def percentiles(latencies):
+    if len(latencies) < 2:
+        return {'requests': len(latencies)}
+    cuts = statistics.quantiles([latency * 1000 for latency in latencies], n=100, method='inclusive')
+    return {'requests': len(latencies), 'p50_ms': round(cuts[49], 2), 'p95_ms': round(cuts[94], 2),
+            'p99_ms': round(cuts[98], 2)}
+
+
+def poll_dashboard(port, cookie, duration):
+    latencies = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        latencies.append(request(port, 'GET', '/api/dashboard', cookie=cookie)[1])
+    return latencies
+
+
+def run_child(args):
+    # One configuration per process: the hasher is set up when app is imported
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='poker-storm-'), 'bench.db')
+    os.environ['PASSWORD_HASH_WORKERS'] = str(args.child)
+    os.environ['PASSWORD_HASH_METHOD'] = args.method
+    import logging
+    from werkzeug.serving import make_server
+    from werkzeug.security import generate_password_hash
+    from app import app, db, User, login_writer, password_hasher
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    with app.app_context():
+        db.create_all()
+        password_hash = generate_password_hash(PASSWORD, method=args.method)
+        db.session.execute(db.insert(User), [{
+            'username': f'user{i}',
+            'player_id': f'P{i:06d}',
+            'password_hash': password_hash
+        } for i in range(args.users)])
+        db.session.commit()
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    response, _ = request(port, 'POST', '/api/auth/login', {'username': 'user0', 'password': PASSWORD})
+    cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+
+    baseline = poll_dashboard(port, cookie, args.duration)
+
+    stopping = threading.Event()
+    lock = threading.Lock()
+    logins = {'ok': 0, 'busy': 0, 'failed': 0, 'latencies': []}
+
+    def storm(index):
+        while not stopping.is_set():
+            response, elapsed = request(port, 'POST', '/api/auth/login',
+                                        {'username': f'user{index % args.users}', 'password': PASSWORD})
+            with lock:
+                if response.status == 200:
+                    logins['ok'] += 1
+                    logins['latencies'].append(elapsed)
+                elif response.status == 503:
+                    logins['busy'] += 1
+                else:
+                    logins['failed'] += 1
+
+    threads = [threading.Thread(target=storm, args=(i,)) for i in range(args.login_threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    during = poll_dashboard(port, cookie, args.duration)
+    stopping.set()
+    for thread in threads:
+        thread.join()
+
+    server.shutdown()
+    login_writer.stop()
+    password_hasher.shutdown()
+    print(json.dumps({
+        'workers': args.child,
+        'dashboard_idle': percentiles(baseline),
+        'dashboard_storm': percentiles(during),
+        'logins': dict(percentiles(logins['latencies']), ok=logins['ok'], busy=logins['busy'],
+                       failed=logins['failed'], per_second=round(logins['ok'] / (args.duration + 0.5), 1))
+    }))
+
+
+def main():
+    args = parse_args()
+    if args.child is not None:
+        return run_child(args)
+
+    results = []
+    for workers in (0, args.workers):
+        label = 'inline' if workers == 0 else f'{workers} worker processes'
+        print(f'Running with hashing {label}...')
+        command = [sys.executable, __file__, '--child', str(workers), '--users', str(args.users),
+                   '--login-threads', str(args.login_threads), '--duration', str(args.duration),
+                   '--method', args.method]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"\n{'hashing':<10} {'dashboard idle p50/p95':>24} {'under storm p50/p95':>22} "
+          f"{'logins/s':>9} {'503s':>6} {'login p95':>10}")
+    for result in results:
+        idle, storm, logins = result['dashboard_idle'], result['dashboard_storm'], result['logins']
+        print(f"{'inline' if result['workers'] == 0 else 'pool x%d' % result['workers']:<10} "
+              f"{idle.get('p50_ms', 0):>11.1f} / {idle.get('p95_ms', 0):>8.1f} "
+              f"{storm.get('p50_ms', 0):>10.1f} / {storm.get('p95_ms', 0):>8.1f} "
+              f"{logins['per_second']:>9.1f} {logins['busy']:>6} {logins.get('p95_ms', 0):>10.1f}")
+    print('(milliseconds)')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
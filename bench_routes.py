@@ -0,0 +1,272 @@
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description='Seed a synthetic database and benchmark the API routes.')
+parser.add_argument('--users', type=int, default=2000)
+parser.add_argument('--players', type=int, default=500)
+parser.add_argument('--sessions', type=int, default=5000)
+parser.add_argument('--seats', type=int, default=6, help='players per session')
+parser.add_argument('--friends', type=int, default=20, help='friendships per user')
+parser.add_argument('--requests', type=int, default=200, help='requests per route and phase')
+parser.add_argument('--threads', type=int, default=8, help='client threads against the WSGI server')
+parser.add_argument('--routes', help='comma-separated route names to run (default: all)')
+parser.add_argument('--output', default='bench_results.json')
+args = None
+
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+
+PASSWORD = 'bench-password'
+
+
+def load_app():
+    # Password hashing workers re-import this script, so the app (and its
+    # database) is only set up from main()
+    global app, db, User, Player, PokerSession, SessionPlayer, PlayerResult, Friendship
+    global rebuild_daily_rollups, rebuild_leaderboard, login_writer
+    # The threaded server needs a file database, not a per-connection :memory: one
+    workdir = tempfile.mkdtemp(prefix='poker-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    from app import (app, db, User, Player, PokerSession, SessionPlayer, PlayerResult, Friendship,
+                     rebuild_daily_rollups, rebuild_leaderboard, login_writer)
+
+
+def seed():
+    random.seed(1234)
+    started = time.perf_counter()
+    # One hash for everybody; hashing per user would dominate seeding
+    password_hash = generate_password_hash(PASSWORD)
+    db.session.execute(db.insert(Player), [{'username': f'player{i}', 'score': 0} for i in range(args.players)])
+    db.session.execute(db.insert(User), [{
+        'username': f'user{i}',
+        'player_id': f'P{i:06d}',
+        'password_hash': password_hash
+    } for i in range(args.users)])
+
+    start_day = datetime(2024, 1, 1)
+    db.session.execute(db.insert(PokerSession), [{
+        'date': start_day + timedelta(days=i % 365, minutes=i),
+        'buy_in_amount': random.choice([20, 50, 100])
+    } for i in range(args.sessions)])
+    seats = []
+    results = []
+    for session_id in range(1, args.sessions + 1):
+        for player_id in random.sample(range(1, args.players + 1), min(args.seats, args.players)):
+            seats.append({'session_id': session_id, 'player_id': player_id})
+            results.append({'session_id': session_id, 'player_id': player_id,
+                            'final_amount': float(random.randint(0, 300))})
+    db.session.execute(db.insert(SessionPlayer), seats)
+    db.session.execute(db.insert(PlayerResult), results)
+
+    friendships = set()
+    for user_id in range(1, args.users + 1):
+        for friend_id in random.sample(range(1, args.users + 1), min(args.friends, args.users)):
+            if friend_id != user_id and (friend_id, user_id) not in friendships:
+                friendships.add((user_id, friend_id))
+    db.session.execute(db.insert(Friendship), [{
+        'user_id': user_id,
+        'friend_id': friend_id,
+        'status': 'accepted' if random.random() < 0.8 else 'pending'
+    } for user_id, friend_id in friendships])
+
+    rebuild_daily_rollups()
+    rebuild_leaderboard()
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return time.perf_counter() - started
+
+
+def routes():
+    user_ids = range(1, args.users + 1)
+    player_ids = range(1, min(args.players, args.users) + 1)
+    return {
+        'login': lambda: ('POST', '/api/auth/login',
+                          {'username': f'user{random.randrange(args.users)}', 'password': PASSWORD}),
+        'leaderboard': lambda: ('GET', '/api/leaderboard', None),
+        'sessions': lambda: ('GET', '/api/sessions?limit=50', None),
+        'players': lambda: ('GET', '/api/players?limit=50', None),
+        'session_results': lambda: ('GET', f'/api/session/{random.randint(1, args.sessions)}/results', None),
+        'profile_stats': lambda: ('GET', f'/api/profile/stats/{random.choice(player_ids)}', None),
+        'dashboard': lambda: ('GET', '/api/dashboard?days=90', None),
+        'friends': lambda: ('GET', '/api/friends', None),
+        'friends_pending': lambda: ('GET', '/api/friends/pending', None),
+        'search_short': lambda: ('GET', f'/api/users/search?query=us', None),
+        'search': lambda: ('GET', f'/api/users/search?query=user{random.choice(user_ids)}', None),
+        'auth_check': lambda: ('GET', '/api/auth/check', None),
+    }
+
+
+class QueryCounter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        with self.lock:
+            self.count += 1
+
+    def take(self):
+        with self.lock:
+            count, self.count = self.count, 0
+            return count
+
+
+def summarize(latencies, elapsed, queries, errors):
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    cuts = statistics.quantiles(latencies_ms, n=100, method='inclusive') if len(latencies_ms) > 1 else latencies_ms * 99
+    return {
+        'requests': len(latencies_ms),
+        'errors': errors,
+        'p50_ms': round(cuts[49], 3),
+        'p95_ms': round(cuts[94], 3),
+        'p99_ms': round(cuts[98], 3),
+        'max_ms': round(latencies_ms[-1], 3),
+        'throughput_rps': round(len(latencies_ms) / elapsed, 1) if elapsed > 0 else 0,
+        'queries_per_request': round(queries / len(latencies_ms), 2)
+    }
+
+
+def run_test_client(make_request, counter):
+    client = app.test_client()
+    with client.session_transaction() as client_session:
+        client_session['user_id'] = 1
+    latencies = []
+    errors = 0
+    counter.take()
+    started = time.perf_counter()
+    for _ in range(args.requests):
+        method, path, body = make_request()
+        request_started = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        latencies.append(time.perf_counter() - request_started)
+        errors += response.status_code >= 400
+    return summarize(latencies, time.perf_counter() - started, counter.take(), errors)
+
+
+def login_cookie(port, user_index):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('POST', '/api/auth/login',
+                 body=json.dumps({'username': f'user{user_index}', 'password': PASSWORD}),
+                 headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.getheader('Set-Cookie').split(';', 1)[0]
+
+
+def run_server(make_request, counter, port, cookies):
+    per_thread = max(1, args.requests // args.threads)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(cookie):
+        local = []
+        local_errors = 0
+        for _ in range(per_thread):
+            method, path, body = make_request()
+            headers = {'Cookie': cookie}
+            if body is not None:
+                headers['Content-Type'] = 'application/json'
+            request_started = time.perf_counter()
+            conn = http.client.HTTPConnection('127.0.0.1', port)
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            local.append(time.perf_counter() - request_started)
+            local_errors += response.status >= 400
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(cookies[i % len(cookies)],)) for i in range(args.threads)]
+    counter.take()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started, counter.take(), errors[0])
+
+
+def print_table(results):
+    print(f"\n{'route':<16} {'phase':<12} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>9} {'queries':>8} {'errors':>7}")
+    for name, phases in results.items():
+        for phase, stats in phases.items():
+            print(f"{name:<16} {phase:<12} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+                  f"{stats['throughput_rps']:>9.1f} {stats['queries_per_request']:>8.2f} {stats['errors']:>7}")
+    print('(latencies in ms)')
+
+
+def main():
+    global args
+    args = parser.parse_args()
+    load_app()
+    selected = routes()
+    if args.routes:
+        wanted = args.routes.split(',')
+        unknown = set(wanted) - set(selected)
+        if unknown:
+            parser.error(f'unknown routes: {", ".join(sorted(unknown))}')
+        selected = {name: selected[name] for name in wanted}
+
+    with app.app_context():
+        db.create_all()
+        seed_seconds = seed()
+        print(f'Seeded {args.users} users, {args.players} players, {args.sessions} sessions in {seed_seconds:.1f}s')
+
+        counter = QueryCounter()
+        event.listen(db.engine, 'before_cursor_execute', counter)
+
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        port = server.server_port
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        cookies = [login_cookie(port, i) for i in range(args.threads)]
+
+        results = {}
+        for name, make_request in selected.items():
+            results[name] = {
+                'test_client': run_test_client(make_request, counter),
+                'server': run_server(make_request, counter, port, cookies)
+            }
+            print(f'{name}: done')
+
+        server.shutdown()
+        event.remove(db.engine, 'before_cursor_execute', counter)
+        login_writer.stop()
+
+    print_table(results)
+    report = {
+        'created_at': datetime.utcnow().isoformat() + 'Z',
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'seed_seconds': round(seed_seconds, 2),
+        'routes': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {args.output}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
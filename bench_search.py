@@ -0,0 +1,71 @@
+import os
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+import user_search
+
+SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = ['ace', 'king', 'riv', 'bluff', 'shark', 'xqz', 'pro', 'er1']
+WORDS = ['ace', 'king', 'river', 'bluff', 'shark', 'pro', 'card', 'chip', 'nut', 'fish', 'flop', 'turn']
+
+
+def random_username(i):
+    return f"{random.choice(WORDS)}{random.choice(WORDS)}{i}{random.choice(string.ascii_lowercase)}"
+
+
+def build_database(path, size):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(80) UNIQUE NOT NULL)")
+    for statement in user_search.CREATE_DDL:
+        conn.execute(statement)
+    conn.executemany("INSERT INTO user (id, username) VALUES (?, ?)",
+                     ((i, random_username(i)) for i in range(1, size + 1)))
+    conn.commit()
+    return conn
+
+
+def indexed_search(conn, query):
+    low, high = user_search.prefix_range(query)
+    conn.execute(user_search.PREFIX_SQL, {'low': low, 'high': high, 'limit': 11}).fetchall()
+    if len(query) >= user_search.MIN_MATCH_LENGTH:
+        conn.execute(user_search.MATCH_SQL, {
+            'match': user_search.match_expression(query),
+            'exclude': 1,
+            'limit': 11
+        }).fetchall()
+
+
+def scan_search(conn, query):
+    conn.execute("SELECT id FROM user WHERE username LIKE ? AND id != 1 LIMIT 10", (f'%{query}%',)).fetchall()
+
+
+def time_queries(conn, search, repeat=5):
+    timings = []
+    for query in QUERIES:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search(conn, query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    random.seed(42)
+    print(f"{'users':>10} {'scan p50':>10} {'scan max':>10} {'index p50':>10} {'index max':>10}  (ms)")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = build_database(os.path.join(tmp, 'bench.db'), size)
+            scan = time_queries(conn, scan_search)
+            indexed = time_queries(conn, indexed_search)
+            conn.close()
+        print(f"{size:>10} {scan[0]:>10.2f} {scan[1]:>10.2f} {indexed[0]:>10.2f} {indexed[1]:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import binary_snapshot
+from poker_repository import JsonRepository
+
+SIZES = [1_000, 10_000, 50_000]
+PLAYERS = [f"player{i}" for i in range(40)]
+
+
+def build_data(size):
+    sessions = []
+    for i in range(size):
+        buyin = float(random.choice([20, 50, 100]))
+        players = []
+        for name in random.sample(PLAYERS, 6):
+            total = buyin * random.randint(1, 3)
+            cash_out = float(random.randint(0, 400))
+            players.append({"name": name, "total_buyins": total, "cash_out": cash_out, "profit": cash_out - total})
+        sessions.append({"date": f"20{10 + i % 15:02d}-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                         "initial_buyin": buyin, "players": players})
+    return {"players": {}, "sessions": sessions, "seq": 0}
+
+
+def startup(path):
+    # What the tracker does before the first screen: load, index, order
+    repo = JsonRepository(path)
+    repo.load()
+    repo.leaderboard()
+    return repo
+
+
+def measure(path, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        startup(path).close()
+        timings.append((time.perf_counter() - start) * 1000)
+    gc.collect()
+    tracemalloc.start()
+    repo = startup(path)
+    memory = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    repo.close()
+    return statistics.median(timings), memory, os.path.getsize(path) / 1024 / 1024
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    random.seed(42)
+    print(f"{'sessions':>10} {'json ms':>10} {'json MB':>9} {'json file':>10} "
+          f"{'pkr ms':>10} {'pkr MB':>9} {'pkr file':>10}")
+    for size in sizes:
+        data = build_data(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "poker_data.json")
+            with open(json_path, "w") as f:
+                json.dump(data, f, indent=4)
+            binary_path = os.path.join(tmp, "binary", "poker_data.pkr")
+            os.mkdir(os.path.dirname(binary_path))
+            binary_snapshot.convert(json_path, binary_path)
+            json_result = measure(json_path)
+            binary_result = measure(binary_path)
+        print(f"{size:>10} {json_result[0]:>10.1f} {json_result[1]:>9.1f} {json_result[2]:>9.1f}M "
+              f"{binary_result[0]:>10.1f} {binary_result[1]:>9.1f} {binary_result[2]:>9.1f}M")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Compact binary snapshot for the desktop tracker (poker_data.pkr).
+
+Layout, little-endian:
+
+    header   magic "PKRS", version, seq, name/session/seat counts
+    names    string table: u16 length + UTF-8 bytes per player name
+    sessions fixed 20-byte records: date ordinal, initial buy-in,
+             first seat, seat count
+    seats    fixed 32-byte records: session, name index, total buy-ins,
+             cash-out, profit
+
+The file is read through mmap. Only the header and string table are
+decoded at load; a session becomes a dict the first time it is indexed,
+and ``seat_rows`` lets the stats index read profits straight from the
+mapped records.
+"""
+import mmap
+import struct
+import sys
+from datetime import date
+
+MAGIC = b"PKRS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQIII")
+NAME_LENGTH = struct.Struct("<H")
+SESSION = struct.Struct("<IdII")
+SEAT = struct.Struct("<IIddd")
+
+
+def write(f, data):
+    names = {}
+    session_records = bytearray()
+    seat_records = bytearray()
+    seat_count = 0
+    for key, session in enumerate(data["sessions"]):
+        players = session["players"]
+        session_records += SESSION.pack(date.fromisoformat(session["date"]).toordinal(),
+                                        session["initial_buyin"], seat_count, len(players))
+        for player in players:
+            index = names.setdefault(player["name"], len(names))
+            seat_records += SEAT.pack(key, index, player["total_buyins"], player["cash_out"], player["profit"])
+        seat_count += len(players)
+
+    f.write(HEADER.pack(MAGIC, VERSION, 0, data.get("seq", 0), len(names), len(data["sessions"]), seat_count))
+    for name in names:
+        encoded = name.encode("utf-8")
+        f.write(NAME_LENGTH.pack(len(encoded)))
+        f.write(encoded)
+    f.write(session_records)
+    f.write(seat_records)
+
+
+def read(path):
+    sessions = SnapshotSessions(path)
+    return {"players": {}, "sessions": sessions, "seq": sessions.seq}
+
+
+class SnapshotSessions:
+    """List-like view of the sessions in a mapped snapshot.
+
+    Decoded sessions are cached, so the journal can mutate them in place;
+    sessions appended after load live in an ordinary list.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.seq, name_count, session_count, seat_count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} poker snapshot")
+
+        offset = HEADER.size
+        self.names = []
+        for _ in range(name_count):
+            (length,) = NAME_LENGTH.unpack_from(self.map, offset)
+            offset += NAME_LENGTH.size
+            self.names.append(self.map[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        self.stored = session_count
+        self.seat_count = seat_count
+        self.sessions_offset = offset
+        self.seats_offset = offset + session_count * SESSION.size
+        self.decoded = {}
+        self.appended = []
+        self.dates = {}
+
+    def __len__(self):
+        return self.stored + len(self.appended)
+
+    def __iter__(self):
+        for key in range(len(self)):
+            yield self[key]
+
+    def __getitem__(self, key):
+        if key < 0:
+            key += len(self)
+        if key >= self.stored:
+            return self.appended[key - self.stored]
+        session = self.decoded.get(key)
+        if session is None:
+            ordinal, initial_buyin, first, count = SESSION.unpack_from(self.map, self.sessions_offset + key * SESSION.size)
+            start = self.seats_offset + first * SEAT.size
+            session = {
+                "date": self._date(ordinal),
+                "initial_buyin": initial_buyin,
+                "players": [{
+                    "name": self.names[name],
+                    "total_buyins": total_buyins,
+                    "cash_out": cash_out,
+                    "profit": profit
+                } for _, name, total_buyins, cash_out, profit in SEAT.iter_unpack(self.map[start:start + count * SEAT.size])]
+            }
+            self.decoded[key] = session
+        return session
+
+    def append(self, session):
+        self.appended.append(session)
+
+    def _date(self, ordinal):
+        # Many sessions share a date; keep one string per day
+        value = self.dates.get(ordinal)
+        if value is None:
+            value = self.dates[ordinal] = date.fromordinal(ordinal).isoformat()
+        return value
+
+    def session_dates(self):
+        """(date, key) for every session without decoding players."""
+        for key in range(self.stored):
+            (ordinal,) = struct.unpack_from("<I", self.map, self.sessions_offset + key * SESSION.size)
+            yield self._date(ordinal), key
+        for key, session in enumerate(self.appended, self.stored):
+            yield session["date"], key
+
+    def seat_rows(self):
+        """(session key, date, name, profit) for every seat, read from the
+        mapped records unless the session was decoded (and maybe changed)."""
+        dates = {}
+        end = self.seats_offset + self.seat_count * SEAT.size
+        for key, name, _, _, profit in SEAT.iter_unpack(self.map[self.seats_offset:end]):
+            if key in self.decoded:
+                continue
+            session_date = dates.get(key)
+            if session_date is None:
+                (ordinal,) = struct.unpack_from("<I", self.map, self.sessions_offset + key * SESSION.size)
+                session_date = dates[key] = self._date(ordinal)
+            yield key, session_date, self.names[name], profit
+        for key, session in self.decoded.items():
+            for player in session["players"]:
+                yield key, session["date"], player["name"], player["profit"]
+        for key, session in enumerate(self.appended, self.stored):
+            for player in session["players"]:
+                yield key, session["date"], player["name"], player["profit"]
+
+    def close(self):
+        self.map.close()
+
+
+def convert(source, target):
+    """Fold source's snapshot and journal into a snapshot at target; the
+    format of each side follows its extension (.json or .pkr)."""
+    from journal_store import JournalStore, write_snapshot
+
+    store = JournalStore(source)
+    data = store.load()
+    store.close()
+    with open(target, "wb" if target.endswith(".pkr") else "w") as f:
+        write_snapshot(target, f, data)
+    return len(data["sessions"])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python binary_snapshot.py poker_data.json poker_data.pkr  (or the reverse)")
+        sys.exit(1)
+    count = convert(sys.argv[1], sys.argv[2])
+    print(f"Wrote {count} sessions to {sys.argv[2]}")
@@ -0,0 +1,129 @@
+import itertools
+import json
+import threading
+from collections import deque
+
+
+class Event:
+    __slots__ = ('id', 'type', 'user_id', 'data', 'encoded', 'lock')
+
+    def __init__(self, event_id, event_type, data, user_id):
+        self.id = event_id
+        self.type = event_type
+        self.user_id = user_id
+        self.data = data
+        self.encoded = None
+        self.lock = threading.Lock()
+
+    def encode(self):
+        # A callable payload is built once, by the first client that needs
+        # it, however many clients receive the event
+        with self.lock:
+            if self.encoded is None:
+                data = self.data() if callable(self.data) else self.data
+                self.encoded = f'id: {self.id}\nevent: {self.type}\ndata: {json.dumps(data)}\n\n'
+            return self.encoded
+
+
+class EventBroker:
+    """In-process publish/subscribe for Server-Sent Events.
+
+    Published events go into a bounded ring buffer and wake every waiting
+    client through one Condition. An idle client is a thread blocked on
+    that Condition (a greenlet under gevent): no polling and no queries,
+    just a keep-alive comment every ``heartbeat`` seconds. That thread is
+    a server request thread held for as long as the client stays
+    connected, so under a threaded WSGI server ``max_clients`` has to stay
+    well below the server's thread count or streams starve every other
+    request. Clients that reconnect
+    with Last-Event-ID get what they missed from the buffer, or a
+    ``reset`` event if it has already rotated out.
+    """
+
+    def __init__(self, history=1000, heartbeat=15, max_clients=100):
+        self.condition = threading.Condition()
+        self.events = deque(maxlen=history)
+        self.ids = itertools.count(1)
+        self.last_id = 0
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        self.clients = 0
+        self.published = 0
+        self.watches = []
+
+    def publish(self, event_type, data=None, user_id=None):
+        """Queue an event for every client, or only for ``user_id``."""
+        with self.condition:
+            event = Event(next(self.ids), event_type, data, user_id)
+            self.events.append(event)
+            self.last_id = event.id
+            self.published += 1
+            self.condition.notify_all()
+
+    def watch(self, check, event_type, data=None):
+        """Publish ``event_type`` whenever ``check()`` returns a new value;
+        checked on heartbeats, for changes made outside this process."""
+        self.watches.append([check, check(), event_type, data])
+
+    def _check_watches(self):
+        changed = []
+        with self.condition:
+            for watch in self.watches:
+                value = watch[0]()
+                if value != watch[1]:
+                    watch[1] = value
+                    changed.append(watch)
+        for _, _, event_type, data in changed:
+            self.publish(event_type, data)
+
+    def connect(self):
+        with self.condition:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+            return True
+
+    def disconnect(self):
+        with self.condition:
+            self.clients -= 1
+
+    def _since(self, last_id):
+        # Event ids are consecutive, so the missed ones are the buffer's tail
+        missed = self.last_id - last_id
+        if missed > len(self.events):
+            return None
+        return list(itertools.islice(self.events, len(self.events) - missed, None))
+
+    def stream(self, user_id=None, last_event_id=None):
+        """Yield SSE frames for one client. Call ``connect`` first and
+        ``disconnect`` when the response is closed."""
+        yield f'retry: {self.heartbeat * 1000}\n\n'
+        with self.condition:
+            last_id = self.last_id if last_event_id is None else min(last_event_id, self.last_id)
+        while True:
+            with self.condition:
+                if self.last_id == last_id:
+                    self.condition.wait(self.heartbeat)
+                pending = self._since(last_id)
+                last_id = self.last_id
+
+            if pending is None:
+                yield f'id: {last_id}\nevent: reset\ndata: null\n\n'
+            elif pending:
+                for event in pending:
+                    if event.user_id is None or event.user_id == user_id:
+                        yield event.encode()
+            else:
+                # Doubles as dead-connection detection: the write fails
+                yield ': keep-alive\n\n'
+                self._check_watches()
+
+    def stats(self):
+        with self.condition:
+            return {
+                'clients': self.clients,
+                'max_clients': self.max_clients,
+                'published': self.published,
+                'last_id': self.last_id,
+                'buffered': len(self.events)
+            }
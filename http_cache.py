@@ -0,0 +1,140 @@
+import hashlib
+import threading
+import uuid
+from datetime import date
+from functools import wraps
+
+from flask import make_response, request, session
+from sqlalchemy import event
+
+
+class ResponseCache:
+    """Conditional GET support for read-only JSON routes.
+
+    Every table has an in-memory version counter that is bumped after a
+    commit touching it. A cached route's ETag is derived from the versions
+    of the tables it reads, so a matching If-None-Match can be answered
+    with a 304 before the view (and the database) is touched. Responses
+    are validated by ETag only: HTTP dates have whole seconds, too coarse
+    to tell a write apart from a response made in the same second, so no
+    Last-Modified is sent and If-Modified-Since is ignored.
+
+    ``external_changes`` is an optional callable returning the time of the
+    last write made by another process (e.g. the desktop tracker); it is
+    folded into every ETag.
+
+    Routes whose answer depends on today's date (``cached(..., daily=True)``)
+    also change their ETag at midnight.
+
+    The counters live in this process. A commit made by another worker
+    of the same app doesn't bump them, so this process would keep
+    answering 304 with stale data. Run the app as a single process
+    (threads are fine), or give each worker a way to notice the others'
+    writes through ``external_changes``.
+    """
+
+    def __init__(self, app=None, db=None, external_changes=None):
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.hits = 0
+        self.misses = 0
+        # Counters restart with the process, so the ETag has to as well
+        self.token = uuid.uuid4().hex
+        self.external_changes = external_changes
+        self.listeners = []
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.extensions['response_cache'] = self
+        event.listen(db.session, 'after_flush', self._track_flush)
+        event.listen(db.session, 'do_orm_execute', self._track_execute)
+        event.listen(db.session, 'after_commit', self._publish)
+        event.listen(db.session, 'after_rollback', self._discard)
+
+    def _pending(self, db_session):
+        return db_session.info.setdefault('changed_tables', set())
+
+    def _track_flush(self, db_session, flush_context):
+        pending = self._pending(db_session)
+        for obj in list(db_session.new) + list(db_session.dirty) + list(db_session.deleted):
+            table = getattr(obj, '__table__', None)
+            if table is not None:
+                pending.add(table.name)
+
+    def _track_execute(self, orm_execute_state):
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = getattr(orm_execute_state.statement, 'table', None)
+            if table is not None:
+                self._pending(orm_execute_state.session).add(table.name)
+
+    def _publish(self, db_session):
+        tables = db_session.info.pop('changed_tables', None)
+        if tables:
+            self.bump(*tables)
+            for listener in self.listeners:
+                listener(tables)
+
+    def on_change(self, listener):
+        """Call ``listener(tables)`` after each commit that changed tables."""
+        self.listeners.append(listener)
+        return listener
+
+    def _discard(self, db_session):
+        db_session.info.pop('changed_tables', None)
+
+    def bump(self, *tables):
+        with self.lock:
+            for table in tables:
+                self.versions[table] = self.versions.get(table, 0) + 1
+
+    def _external(self):
+        return self.external_changes() if self.external_changes is not None else 0
+
+    def etag_for(self, tables, daily=False):
+        key = '|'.join([
+            self.token,
+            request.full_path,
+            str(session.get('user_id')),
+            ','.join(f'{table}:{self.versions.get(table, 0)}' for table in tables),
+            str(self._external()),
+            date.today().isoformat() if daily else ''
+        ])
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def cached(self, *tables, daily=False):
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if request.method != 'GET':
+                    return f(*args, **kwargs)
+
+                etag = self.etag_for(tables, daily)
+                # Weak comparison: proxies that compress a response mark
+                # its ETag weak (W/"...") but the content is the same
+                if request.if_none_match.contains_weak(etag):
+                    with self.lock:
+                        self.hits += 1
+                    response = make_response('', 304)
+                else:
+                    with self.lock:
+                        self.misses += 1
+                    response = make_response(f(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+            return decorated_function
+        return decorator
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total * 100, 1) if total else 0,
+                'versions': dict(self.versions)
+            }
@@ -0,0 +1,238 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import binary_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def empty_data():
+    return {"players": {}, "sessions": []}
+
+
+def is_binary(path):
+    return path.endswith(".pkr")
+
+
+def read_snapshot(path):
+    # .pkr snapshots are mapped and decoded lazily; see binary_snapshot.py
+    if is_binary(path):
+        return binary_snapshot.read(path)
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_snapshot(path, f, data):
+    if is_binary(path):
+        binary_snapshot.write(f, data)
+    else:
+        json.dump(dict(data, sessions=list(data["sessions"])), f, indent=4)
+
+
+def find_player(session, name):
+    for player in session["players"]:
+        if player["name"] == name:
+            return player
+    raise KeyError(name)
+
+
+def apply_event(data, event):
+    kind = event["type"]
+    if kind == "session":
+        data["sessions"].append(event["session"])
+    elif kind == "rebuy":
+        player = find_player(data["sessions"][event["session"]], event["player"])
+        player["total_buyins"] += event["amount"]
+    elif kind == "cashout":
+        player = find_player(data["sessions"][event["session"]], event["player"])
+        player["cash_out"] = event["cash_out"]
+        player["profit"] = event["cash_out"] - player["total_buyins"]
+    else:
+        raise ValueError(f"Unknown journal event: {kind}")
+
+
+class JournalStore:
+    """Snapshot (poker_data.json) plus an append-only journal of events.
+
+    Every change is one compact JSON line appended to the journal, so a
+    rebuy or cash-out costs the same regardless of history size. Once the
+    journal holds ``compact_after`` events it is rotated and a background
+    thread folds it into a new snapshot. Each event carries a sequence
+    number and the snapshot records the last one it includes, so replay
+    after a crash at any point never applies an event twice.
+
+    ``record`` only updates memory and queues the line; a writer thread
+    waits until changes stop for ``debounce`` seconds (at most
+    ``max_delay``) and appends the whole burst with one write and fsync.
+    ``on_status(state, detail)`` is called from that thread with
+    "saving", "saved" or "error". ``close`` flushes everything queued.
+    """
+
+    def __init__(self, data_file, compact_after=500, debounce=0.2, max_delay=1.0, on_status=None):
+        self.data_file = data_file
+        self.journal_file = os.path.splitext(data_file)[0] + ".journal"
+        self.rotated_file = self.journal_file + ".compacting"
+        self.compact_after = compact_after
+        self.journal = None
+        self.compactor = None
+        self.seq = 0
+        self.pending = 0
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.on_status = on_status
+        self.queue = queue.Queue()
+        self.writer = None
+        self.unwritten = []
+
+    def load(self):
+        # A mapped snapshot can't be replaced on every platform, so an
+        # interrupted compaction is finished before mapping it
+        if is_binary(self.data_file) and os.path.exists(self.rotated_file):
+            self._compact()
+        data = self._read_snapshot()
+        if os.path.exists(self.rotated_file):
+            self._replay(self.rotated_file, data)
+        self.pending = 0
+        if os.path.exists(self.journal_file):
+            self.pending = self._replay(self.journal_file, data, repair=True)
+        self.seq = data.get("seq", 0)
+        self.journal = open(self.journal_file, "a", encoding="utf-8")
+
+        # A compaction was interrupted; finish it in the background
+        if os.path.exists(self.rotated_file):
+            self._start_compactor()
+        return data
+
+    def _read_snapshot(self):
+        if not os.path.exists(self.data_file):
+            return empty_data()
+        return read_snapshot(self.data_file)
+
+    def _replay(self, path, data, repair=False):
+        applied = 0
+        good_offset = 0
+        with open(path, "rb") as f:
+            for line in f:
+                # A line without its newline is a write torn by a crash
+                if not line.endswith(b"\n"):
+                    break
+                good_offset += len(line)
+                event = json.loads(line)
+                if event["seq"] <= data.get("seq", 0):
+                    continue
+                apply_event(data, event)
+                data["seq"] = event["seq"]
+                applied += 1
+        if repair and good_offset < os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(good_offset)
+        return applied
+
+    def record(self, data, event):
+        self.seq += 1
+        event["seq"] = self.seq
+        apply_event(data, event)
+        data["seq"] = self.seq
+        if self.writer is None:
+            self.writer = threading.Thread(target=self._run_writer, name="journal-writer", daemon=True)
+            self.writer.start()
+        self.queue.put(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def _run_writer(self):
+        stopping = False
+        while not stopping:
+            line = self.queue.get()
+            if line is None:
+                break
+            lines = [line]
+            deadline = time.monotonic() + self.max_delay
+            # Keep collecting until the burst goes quiet or max_delay passes
+            while True:
+                timeout = min(self.debounce, deadline - time.monotonic())
+                try:
+                    line = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if line is None:
+                    stopping = True
+                    break
+                lines.append(line)
+            self._write(lines)
+        self._write([])
+
+    def _write(self, lines):
+        # Lines from a failed write are kept and retried with the next burst
+        lines = self.unwritten + lines
+        if not lines:
+            return
+        self._report("saving", len(lines))
+        try:
+            self.journal.write("".join(lines))
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+        except OSError as e:
+            logger.exception("Failed to append %d journal events", len(lines))
+            self.unwritten = lines
+            self._report("error", str(e))
+            return
+        self.unwritten = []
+        self.pending += len(lines)
+        if self.pending >= self.compact_after:
+            self.compact()
+        self._report("saved", len(lines))
+
+    def _report(self, state, detail):
+        if self.on_status is not None:
+            self.on_status(state, detail)
+
+    def compact(self):
+        if self.compactor is not None and self.compactor.is_alive():
+            return
+        if os.path.exists(self.rotated_file) or not self.pending:
+            return
+        self.journal.close()
+        os.replace(self.journal_file, self.rotated_file)
+        self.journal = open(self.journal_file, "a", encoding="utf-8")
+        self.pending = 0
+        self._start_compactor()
+
+    def _start_compactor(self):
+        self.compactor = threading.Thread(target=self._compact, name="journal-compactor")
+        self.compactor.start()
+
+    def _compact(self):
+        # Rebuilt from files only, so it never touches the UI thread's data
+        data = self._read_snapshot()
+        data.setdefault("seq", 0)
+        self._replay(self.rotated_file, data)
+        temp_file = self.data_file + ".tmp"
+        with open(temp_file, "wb" if is_binary(self.data_file) else "w") as f:
+            write_snapshot(self.data_file, f, data)
+            f.flush()
+            os.fsync(f.fileno())
+        if hasattr(data["sessions"], "close"):
+            data["sessions"].close()
+        try:
+            os.replace(temp_file, self.data_file)
+        except PermissionError:
+            # Windows won't replace a file the app has mapped; the rotated
+            # journal is folded in at the next startup instead
+            logger.warning("Snapshot is in use; compaction deferred to next start")
+            os.remove(temp_file)
+            return
+        os.remove(self.rotated_file)
+
+    def close(self):
+        if self.writer is not None:
+            self.queue.put(None)
+            self.writer.join()
+            self.writer = None
+        if self.compactor is not None:
+            self.compactor.join()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
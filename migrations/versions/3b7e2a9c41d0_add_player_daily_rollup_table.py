@@ -0,0 +1,52 @@
+"""Add player daily rollup table
+
+Revision ID: 3b7e2a9c41d0
+Revises: 60f13173f5ca
+Create Date: 2026-10-18 09:12:05.418223
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7e2a9c41d0'
+down_revision = '60f13173f5ca'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('player_daily_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('winning_sessions', sa.Integer(), nullable=False),
+    sa.Column('total_profit', sa.Float(), nullable=False),
+    sa.Column('best_profit', sa.Float(), nullable=True),
+    sa.Column('worst_profit', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('player_id', 'day', name='unique_player_day')
+    )
+
+    # Backfill from the results recorded before the rollups existed
+    op.execute("""
+        INSERT INTO player_daily_rollup
+            (player_id, day, sessions, winning_sessions, total_profit, best_profit, worst_profit)
+        SELECT r.player_id,
+               date(s.date),
+               COUNT(*),
+               SUM(CASE WHEN r.final_amount - COALESCE(s.buy_in_amount, 0) > 0 THEN 1 ELSE 0 END),
+               SUM(r.final_amount - COALESCE(s.buy_in_amount, 0)),
+               MAX(r.final_amount - COALESCE(s.buy_in_amount, 0)),
+               MIN(r.final_amount - COALESCE(s.buy_in_amount, 0))
+        FROM player_result r
+        JOIN poker_session s ON s.id = r.session_id
+        GROUP BY r.player_id, date(s.date)
+    """)
+
+
+def downgrade():
+    op.drop_table('player_daily_rollup')
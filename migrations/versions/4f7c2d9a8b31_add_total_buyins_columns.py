@@ -0,0 +1,32 @@
+"""Track rebuys on session seats and results
+
+Revision ID: 4f7c2d9a8b31
+Revises: e9a4b1d7c2f6
+Create Date: 2026-10-18 16:05:41.527390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f7c2d9a8b31'
+down_revision = 'e9a4b1d7c2f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('session_player', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_buyins', sa.Float(), nullable=True))
+
+    with op.batch_alter_table('player_result', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_buyins', sa.Float(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('player_result', schema=None) as batch_op:
+        batch_op.drop_column('total_buyins')
+
+    with op.batch_alter_table('session_player', schema=None) as batch_op:
+        batch_op.drop_column('total_buyins')
@@ -0,0 +1,49 @@
+"""Add leaderboard entry table
+
+Revision ID: 8d41c6f2e5b7
+Revises: 3b7e2a9c41d0
+Create Date: 2026-10-18 11:47:32.905114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41c6f2e5b7'
+down_revision = '3b7e2a9c41d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('leaderboard_entry',
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('total_profit', sa.Float(), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('best_result', sa.Float(), nullable=True),
+    sa.Column('worst_result', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['player_id'], ['player.id'], ),
+    sa.PrimaryKeyConstraint('player_id')
+    )
+    with op.batch_alter_table('leaderboard_entry', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_leaderboard_entry_total_profit'), ['total_profit'], unique=False)
+
+    op.execute("""
+        INSERT INTO leaderboard_entry (player_id, total_profit, sessions, best_result, worst_result)
+        SELECT r.player_id,
+               SUM(r.final_amount - COALESCE(s.buy_in_amount, 0)),
+               COUNT(*),
+               MAX(r.final_amount - COALESCE(s.buy_in_amount, 0)),
+               MIN(r.final_amount - COALESCE(s.buy_in_amount, 0))
+        FROM player_result r
+        JOIN poker_session s ON s.id = r.session_id
+        GROUP BY r.player_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('leaderboard_entry', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_leaderboard_entry_total_profit'))
+
+    op.drop_table('leaderboard_entry')
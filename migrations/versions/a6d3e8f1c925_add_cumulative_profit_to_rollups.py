@@ -0,0 +1,37 @@
+"""Keep a running profit total on daily rollups
+
+Revision ID: a6d3e8f1c925
+Revises: 4f7c2d9a8b31
+Create Date: 2026-10-18 18:42:13.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3e8f1c925'
+down_revision = '4f7c2d9a8b31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('player_daily_rollup', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cumulative_profit', sa.Float(), nullable=False, server_default='0'))
+
+    # Backfill each row with the player's total up to and including its day
+    op.execute("""
+        UPDATE player_daily_rollup
+        SET cumulative_profit = (
+            SELECT SUM(earlier.total_profit)
+            FROM player_daily_rollup earlier
+            WHERE earlier.player_id = player_daily_rollup.player_id
+              AND earlier.day <= player_daily_rollup.day
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('player_daily_rollup', schema=None) as batch_op:
+        batch_op.drop_column('cumulative_profit')
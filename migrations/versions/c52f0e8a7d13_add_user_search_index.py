@@ -0,0 +1,41 @@
+"""Add FTS5 trigram index for user search
+
+Revision ID: c52f0e8a7d13
+Revises: 8d41c6f2e5b7
+Create Date: 2026-10-18 14:05:51.672930
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52f0e8a7d13'
+down_revision = '8d41c6f2e5b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE INDEX IF NOT EXISTS ix_user_username_lower ON user (lower(username))")
+    op.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5(
+        username, content='user', content_rowid='id', tokenize='trigram'
+    )""")
+    op.execute("""CREATE TRIGGER IF NOT EXISTS user_search_ai AFTER INSERT ON user BEGIN
+        INSERT INTO user_search(rowid, username) VALUES (new.id, new.username);
+    END""")
+    op.execute("""CREATE TRIGGER IF NOT EXISTS user_search_ad AFTER DELETE ON user BEGIN
+        INSERT INTO user_search(user_search, rowid, username) VALUES ('delete', old.id, old.username);
+    END""")
+    op.execute("""CREATE TRIGGER IF NOT EXISTS user_search_au AFTER UPDATE OF username ON user BEGIN
+        INSERT INTO user_search(user_search, rowid, username) VALUES ('delete', old.id, old.username);
+        INSERT INTO user_search(rowid, username) VALUES (new.id, new.username);
+    END""")
+    op.execute("INSERT INTO user_search(user_search) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS user_search_au")
+    op.execute("DROP TRIGGER IF EXISTS user_search_ad")
+    op.execute("DROP TRIGGER IF EXISTS user_search_ai")
+    op.execute("DROP TABLE IF EXISTS user_search")
+    op.execute("DROP INDEX IF EXISTS ix_user_username_lower")
@@ -0,0 +1,58 @@
+"""Add indexes for hot lookups
+
+Revision ID: e9a4b1d7c2f6
+Revises: c52f0e8a7d13
+Create Date: 2026-10-18 15:22:09.118407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9a4b1d7c2f6'
+down_revision = 'c52f0e8a7d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('player_result', schema=None) as batch_op:
+        batch_op.create_index('ix_player_result_session_player', ['session_id', 'player_id'], unique=False)
+        batch_op.create_index('ix_player_result_player_session', ['player_id', 'session_id'], unique=False)
+
+    with op.batch_alter_table('session_player', schema=None) as batch_op:
+        batch_op.create_index('ix_session_player_player_session', ['player_id', 'session_id'], unique=False)
+        batch_op.create_index('ix_session_player_session', ['session_id'], unique=False)
+
+    with op.batch_alter_table('friendship', schema=None) as batch_op:
+        batch_op.create_index('ix_friendship_user_status', ['user_id', 'status'], unique=False)
+        batch_op.create_index('ix_friendship_friend_status', ['friend_id', 'status'], unique=False)
+
+    with op.batch_alter_table('login_history', schema=None) as batch_op:
+        batch_op.create_index('ix_login_history_user_time', ['user_id', 'login_time'], unique=False)
+
+    with op.batch_alter_table('poker_session', schema=None) as batch_op:
+        batch_op.create_index('ix_poker_session_date', ['date'], unique=False)
+
+    op.execute('ANALYZE')
+
+
+def downgrade():
+    with op.batch_alter_table('poker_session', schema=None) as batch_op:
+        batch_op.drop_index('ix_poker_session_date')
+
+    with op.batch_alter_table('login_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_login_history_user_time')
+
+    with op.batch_alter_table('friendship', schema=None) as batch_op:
+        batch_op.drop_index('ix_friendship_friend_status')
+        batch_op.drop_index('ix_friendship_user_status')
+
+    with op.batch_alter_table('session_player', schema=None) as batch_op:
+        batch_op.drop_index('ix_session_player_session')
+        batch_op.drop_index('ix_session_player_player_session')
+
+    with op.batch_alter_table('player_result', schema=None) as batch_op:
+        batch_op.drop_index('ix_player_result_player_session')
+        batch_op.drop_index('ix_player_result_session_player')
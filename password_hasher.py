@@ -0,0 +1,147 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Too many hashes are already queued; the caller should retry later."""
+
+
+def method_of(pwhash):
+    # werkzeug hashes look like "scrypt:32768:8:1$salt$hash"
+    return pwhash.split('$', 1)[0]
+
+
+_full_methods = {}
+
+
+def full_method(method):
+    # "scrypt" is stored as "scrypt:32768:8:1"; werkzeug's defaults can
+    # change between versions, so ask it rather than hard-code them
+    if method not in _full_methods:
+        _full_methods[method] = method_of(generate_password_hash('', method=method))
+    return _full_methods[method]
+
+
+def _lower_priority():
+    # Requests that don't hash get the CPU first when cores are short
+    if hasattr(os, 'nice'):
+        os.nice(5)
+
+
+def _verify(pwhash, password, method):
+    # Runs in a worker; a stale hash is replaced in the same round trip
+    if not check_password_hash(pwhash, password):
+        return False, None
+    if method_of(pwhash) != full_method(method):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+class PasswordHasher:
+    """Password hashing on a small process pool.
+
+    Password hashes are deliberately CPU-heavy. Hashed on request threads,
+    a burst of logins takes every thread and core and stalls unrelated
+    requests behind it. Here hashing is confined to ``workers`` separate
+    processes instead, and at most ``max_pending`` hashes can be waiting
+    at once: beyond that ``hash`` and ``verify`` raise HasherBusy straight
+    away rather than queue work the client will have given up on.
+    ``workers=0`` hashes inline.
+
+    The pool uses spawn, so each worker starts by importing the program's
+    ``__main__`` module again (as ``__mp_main__``). A script that imports
+    the app and hashes must keep its own work under
+    ``if __name__ == '__main__':``, otherwise every worker runs it again.
+
+    ``method`` is passed to werkzeug's generate_password_hash. A login
+    whose stored hash used a different method gets a fresh hash back from
+    ``verify`` so the caller can save it.
+    """
+
+    def __init__(self, method='scrypt', workers=2, max_pending=32, timeout=10):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = None
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.counters = {
+            'hashed': 0,
+            'verified': 0,
+            'rehashed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+        }
+
+    def _count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.counters['rejected'] += 1
+                raise HasherBusy()
+            self.pending += 1
+            if self.executor is None:
+                # spawn, not fork: the web process has threads and open
+                # database connections that a forked child shouldn't share
+                self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                    mp_context=multiprocessing.get_context('spawn'),
+                                                    initializer=_lower_priority)
+                atexit.register(self.shutdown)
+            try:
+                future = self.executor.submit(fn, *args)
+            except BaseException:
+                self.pending -= 1
+                raise
+        # A hash still running in a worker after the timeout keeps its slot
+        # until it really finishes; cancel() can only drop queued ones
+        future.add_done_callback(self._finished)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            self._count('timeouts')
+            raise HasherBusy()
+
+    def _finished(self, future):
+        with self.lock:
+            self.pending -= 1
+
+    def hash(self, password):
+        pwhash = self._run(generate_password_hash, password, self.method)
+        self._count('hashed')
+        return pwhash
+
+    def verify(self, pwhash, password):
+        """Return (matches, new_hash); new_hash is None unless the stored
+        hash should be replaced with one using the current method."""
+        matches, new_hash = self._run(_verify, pwhash, password, self.method)
+        self._count('verified')
+        if new_hash is not None:
+            self._count('rehashed')
+        return matches, new_hash
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats['pending'] = self.pending
+        stats['method'] = self.method
+        stats['workers'] = self.workers
+        stats['max_pending'] = self.max_pending
+        return stats
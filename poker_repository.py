@@ -0,0 +1,636 @@
+"""Storage for poker sessions shared by the desktop tracker and the web app.
+
+``JsonRepository`` keeps the original poker_data.json (+ journal) format.
+``SQLiteRepository`` stores the same data in the web app's SQLite schema
+(player, poker_session, session_player, player_result) and keeps its
+leaderboard and daily rollup tables up to date, so both front ends read
+one database. ``migrate_json`` copies a JSON history into SQLite in one
+transaction.
+"""
+import os
+import sqlite3
+import sys
+from array import array
+from bisect import insort
+from datetime import datetime
+
+from journal_store import JournalStore, find_player
+from sqlite_engine import DEFAULT_PRAGMAS
+
+# Matches the web app's models; CREATE ... IF NOT EXISTS so the desktop
+# app can start from an empty file or an existing web database
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS player (
+        id INTEGER NOT NULL PRIMARY KEY,
+        username VARCHAR(80) NOT NULL UNIQUE,
+        score INTEGER,
+        avatar VARCHAR(200),
+        created_at DATETIME
+    )""",
+    """CREATE TABLE IF NOT EXISTS poker_session (
+        id INTEGER NOT NULL PRIMARY KEY,
+        date DATETIME NOT NULL,
+        buy_in_amount FLOAT,
+        notes TEXT,
+        created_at DATETIME
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_poker_session_date ON poker_session (date)",
+    """CREATE TABLE IF NOT EXISTS session_player (
+        id INTEGER NOT NULL PRIMARY KEY,
+        session_id INTEGER NOT NULL REFERENCES poker_session (id),
+        player_id INTEGER NOT NULL REFERENCES player (id),
+        total_buyins FLOAT
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_session_player_player_session ON session_player (player_id, session_id)",
+    "CREATE INDEX IF NOT EXISTS ix_session_player_session ON session_player (session_id)",
+    """CREATE TABLE IF NOT EXISTS player_result (
+        id INTEGER NOT NULL PRIMARY KEY,
+        session_id INTEGER NOT NULL REFERENCES poker_session (id),
+        player_id INTEGER NOT NULL REFERENCES player (id),
+        final_amount FLOAT NOT NULL,
+        total_buyins FLOAT
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_player_result_session_player ON player_result (session_id, player_id)",
+    "CREATE INDEX IF NOT EXISTS ix_player_result_player_session ON player_result (player_id, session_id)",
+    """CREATE TABLE IF NOT EXISTS player_daily_rollup (
+        id INTEGER NOT NULL PRIMARY KEY,
+        player_id INTEGER NOT NULL REFERENCES player (id),
+        day DATE NOT NULL,
+        sessions INTEGER NOT NULL,
+        winning_sessions INTEGER NOT NULL,
+        total_profit FLOAT NOT NULL,
+        best_profit FLOAT,
+        worst_profit FLOAT,
+        cumulative_profit FLOAT NOT NULL DEFAULT 0,
+        CONSTRAINT unique_player_day UNIQUE (player_id, day)
+    )""",
+    """CREATE TABLE IF NOT EXISTS leaderboard_entry (
+        player_id INTEGER NOT NULL PRIMARY KEY REFERENCES player (id),
+        total_profit FLOAT NOT NULL,
+        sessions INTEGER NOT NULL,
+        best_result FLOAT,
+        worst_result FLOAT
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_leaderboard_entry_total_profit ON leaderboard_entry (total_profit)",
+]
+
+PROFIT_SQL = "r.final_amount - COALESCE(r.total_buyins, s.buy_in_amount, 0)"
+
+REBUILD_LEADERBOARD_SQL = f"""
+    INSERT INTO leaderboard_entry (player_id, total_profit, sessions, best_result, worst_result)
+    SELECT r.player_id, SUM({PROFIT_SQL}), COUNT(*), MAX({PROFIT_SQL}), MIN({PROFIT_SQL})
+    FROM player_result r JOIN poker_session s ON s.id = r.session_id
+    {{where}}
+    GROUP BY r.player_id
+"""
+
+REBUILD_ROLLUPS_SQL = f"""
+    INSERT INTO player_daily_rollup
+        (player_id, day, sessions, winning_sessions, total_profit, best_profit, worst_profit, cumulative_profit)
+    SELECT r.player_id, date(s.date), COUNT(*),
+           SUM(CASE WHEN {PROFIT_SQL} > 0 THEN 1 ELSE 0 END),
+           SUM({PROFIT_SQL}), MAX({PROFIT_SQL}), MIN({PROFIT_SQL}),
+           SUM(SUM({PROFIT_SQL})) OVER (PARTITION BY r.player_id ORDER BY date(s.date))
+    FROM player_result r JOIN poker_session s ON s.id = r.session_id
+    {{where}}
+    GROUP BY r.player_id, date(s.date)
+"""
+
+# Fold one result's change into its player's aggregates. A new day's
+# running total starts from the player's last earlier day, then that day
+# and every later one are shifted by the delta.
+UPSERT_ROLLUP_SQL = """
+    INSERT INTO player_daily_rollup
+        (player_id, day, sessions, winning_sessions, total_profit, best_profit, worst_profit, cumulative_profit)
+    VALUES (:player_id, :day, :sessions, :wins, :delta, :profit, :profit, COALESCE(
+        (SELECT cumulative_profit FROM player_daily_rollup
+         WHERE player_id = :player_id AND day < :day ORDER BY day DESC LIMIT 1), 0))
+    ON CONFLICT (player_id, day) DO UPDATE SET
+        sessions = sessions + excluded.sessions,
+        winning_sessions = winning_sessions + excluded.winning_sessions,
+        total_profit = total_profit + excluded.total_profit,
+        best_profit = MAX(best_profit, excluded.best_profit),
+        worst_profit = MIN(worst_profit, excluded.worst_profit)
+"""
+
+UPSERT_LEADERBOARD_SQL = """
+    INSERT INTO leaderboard_entry (player_id, total_profit, sessions, best_result, worst_result)
+    VALUES (:player_id, :delta, :sessions, :profit, :profit)
+    ON CONFLICT (player_id) DO UPDATE SET
+        total_profit = total_profit + excluded.total_profit,
+        sessions = sessions + excluded.sessions,
+        best_result = MAX(best_result, excluded.best_result),
+        worst_result = MIN(worst_result, excluded.worst_result)
+"""
+
+SHIFT_CUMULATIVE_SQL = """
+    UPDATE player_daily_rollup SET cumulative_profit = cumulative_profit + :delta
+    WHERE player_id = :player_id AND day >= :day
+"""
+
+# Min/max can't be decremented: a changed result that was the extreme has
+# its player's (and that day's) extremes read back from the results
+RESET_ROLLUP_EXTREMES_SQL = f"""
+    UPDATE player_daily_rollup SET
+        best_profit = (SELECT MAX({PROFIT_SQL}) FROM player_result r JOIN poker_session s ON s.id = r.session_id
+                       WHERE r.player_id = :player_id AND date(s.date) = :day),
+        worst_profit = (SELECT MIN({PROFIT_SQL}) FROM player_result r JOIN poker_session s ON s.id = r.session_id
+                        WHERE r.player_id = :player_id AND date(s.date) = :day)
+    WHERE player_id = :player_id AND day = :day AND :previous IN (best_profit, worst_profit)
+"""
+
+RESET_LEADERBOARD_EXTREMES_SQL = f"""
+    UPDATE leaderboard_entry SET
+        best_result = (SELECT MAX({PROFIT_SQL}) FROM player_result r JOIN poker_session s ON s.id = r.session_id
+                       WHERE r.player_id = :player_id),
+        worst_result = (SELECT MIN({PROFIT_SQL}) FROM player_result r JOIN poker_session s ON s.id = r.session_id
+                        WHERE r.player_id = :player_id)
+    WHERE player_id = :player_id AND :previous IN (best_result, worst_result)
+"""
+
+
+def change_marker_path(db_path):
+    return db_path + ".changed"
+
+
+def change_marker(db_path):
+    # Touched after every desktop commit so the web app's response cache
+    # can notice writes from another process with a single stat() call
+    try:
+        return os.stat(change_marker_path(db_path)).st_mtime
+    except OSError:
+        return 0
+
+
+def has_result(player):
+    # The desktop app stores "not cashed out yet" as cash_out 0 and profit 0
+    return not (player["cash_out"] == 0 and player["profit"] == 0)
+
+
+def seat_rows(sessions):
+    # Binary snapshots yield these without building session dicts
+    if hasattr(sessions, "seat_rows"):
+        return sessions.seat_rows()
+    return ((key, session["date"], player["name"], player["profit"])
+            for key, session in enumerate(sessions) for player in session["players"])
+
+
+def session_dates(sessions):
+    if hasattr(sessions, "session_dates"):
+        return sessions.session_dates()
+    return ((session["date"], key) for key, session in enumerate(sessions))
+
+
+class PlayerSeries:
+    """One player's results: a profit array plus running totals."""
+
+    __slots__ = ("profits", "dates", "slots", "total", "best", "worst")
+
+    def __init__(self):
+        self.profits = array("d")
+        self.dates = []
+        self.slots = {}
+        self.total = 0.0
+        # Start at 0 like the original screens did
+        self.best = 0.0
+        self.worst = 0.0
+
+    def add(self, session_key, date, profit):
+        self.slots[session_key] = len(self.profits)
+        self.profits.append(profit)
+        self.dates.append(date)
+        self.total += profit
+        self.best = max(self.best, profit)
+        self.worst = min(self.worst, profit)
+
+    def set_profit(self, session_key, profit):
+        slot = self.slots[session_key]
+        old = self.profits[slot]
+        self.profits[slot] = profit
+        self.total += profit - old
+        if old == self.best or old == self.worst:
+            # The old value was an extreme; only this player's series is rescanned
+            self.best = max(0.0, max(self.profits))
+            self.worst = min(0.0, min(self.profits))
+        else:
+            self.best = max(self.best, profit)
+            self.worst = min(self.worst, profit)
+
+
+class StatsIndex:
+    """Per-player series built once at load and kept current on writes,
+    so the leaderboard and stats screens never walk every session."""
+
+    def __init__(self):
+        self.players = {}
+
+    @classmethod
+    def build(cls, data):
+        index = cls()
+        for session_key, date, name, profit in seat_rows(data["sessions"]):
+            series = index.players.get(name)
+            if series is None:
+                series = index.players[name] = PlayerSeries()
+            series.add(session_key, date, profit)
+        return index
+
+    def add_session(self, session_key, session):
+        for player in session["players"]:
+            series = self.players.get(player["name"])
+            if series is None:
+                series = self.players[player["name"]] = PlayerSeries()
+            series.add(session_key, session["date"], player["profit"])
+
+    def set_profit(self, session_key, name, profit):
+        self.players[name].set_profit(session_key, profit)
+
+    def leaderboard(self):
+        return sorted(((name, series.total, len(series.profits)) for name, series in self.players.items()),
+                      key=lambda x: x[1], reverse=True)
+
+    def player_names(self):
+        return sorted(self.players)
+
+    def player_stats(self, name):
+        series = self.players.get(name)
+        if series is None:
+            return {"total_sessions": 0, "total_profit": 0, "biggest_win": 0, "biggest_loss": 0, "history": []}
+        return {
+            "total_sessions": len(series.profits),
+            "total_profit": series.total,
+            "biggest_win": series.best,
+            "biggest_loss": series.worst,
+            "history": sorted(zip(series.dates, series.profits), key=lambda x: x[0], reverse=True)
+        }
+
+
+class JsonRepository:
+    def __init__(self, data_file, on_status=None):
+        # Journal appends happen on the store's writer thread
+        self.store = JournalStore(data_file, on_status=on_status)
+        self.data = None
+        self.index = None
+        self.order = None
+        # Bumped on every write so screens know when to refresh
+        self.version = 0
+
+    def load(self):
+        self.data = self.store.load()
+        self.index = StatsIndex.build(self.data)
+        # (date, key) ascending; pages are read from the end, newest first
+        self.order = sorted(session_dates(self.data["sessions"]))
+
+    def close(self):
+        self.store.close()
+        if hasattr(self.data["sessions"], "close"):
+            self.data["sessions"].close()
+
+    def create_session(self, date, initial_buyin, names):
+        session_data = {
+            "date": date,
+            "initial_buyin": initial_buyin,
+            "players": [{
+                "name": name,
+                "total_buyins": initial_buyin,
+                "cash_out": 0,
+                "profit": 0
+            } for name in names]
+        }
+        self.store.record(self.data, {"type": "session", "session": session_data})
+        self.version += 1
+        session_key = len(self.data["sessions"]) - 1
+        self.index.add_session(session_key, session_data)
+        insort(self.order, (date, session_key))
+        return session_key
+
+    def add_rebuy(self, session_key, name, amount):
+        # Profit is only settled at cash-out, so the index is unaffected
+        self.store.record(self.data, {"type": "rebuy", "session": session_key,
+                                      "player": name, "amount": amount})
+        self.version += 1
+
+    def record_cashout(self, session_key, name, cash_out):
+        self.store.record(self.data, {"type": "cashout", "session": session_key,
+                                      "player": name, "cash_out": cash_out})
+        self.version += 1
+        profit = find_player(self.data["sessions"][session_key], name)["profit"]
+        self.index.set_profit(session_key, name, profit)
+
+    def get_session(self, session_key):
+        return self.data["sessions"][session_key]
+
+    def sessions(self, offset=0, limit=None):
+        # Newest first
+        stop = len(self.order) - offset
+        start = 0 if limit is None else max(stop - limit, 0)
+        return [self.data["sessions"][key] for _, key in reversed(self.order[start:max(stop, 0)])]
+
+    def player_names(self):
+        return self.index.player_names()
+
+    def leaderboard(self):
+        return self.index.leaderboard()
+
+    def player_stats(self, name):
+        return self.index.player_stats(name)
+
+
+class SQLiteRepository:
+    def __init__(self, db_path, on_status=None):
+        self.db_path = db_path
+        self.on_status = on_status
+        self.conn = None
+        self.writes = 0
+
+    def load(self):
+        # isolation_level=None: transactions are opened explicitly below.
+        # sqlite3 caches the prepared statement for each SQL string.
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=256)
+        for name, value in DEFAULT_PRAGMAS.items():
+            self.conn.execute(f"PRAGMA {name}={value}")
+        with self.transaction():
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+            self._add_missing_columns()
+
+    def _add_missing_columns(self):
+        # Web databases created before seats and results tracked rebuys
+        for table in ("session_player", "player_result"):
+            columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            if "total_buyins" not in columns:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN total_buyins FLOAT")
+        # ...and before rollups kept a running total
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(player_daily_rollup)")}
+        if "cumulative_profit" not in columns:
+            self.conn.execute("ALTER TABLE player_daily_rollup ADD COLUMN cumulative_profit FLOAT NOT NULL DEFAULT 0")
+            self.conn.execute("DELETE FROM player_daily_rollup")
+            self.conn.execute(REBUILD_ROLLUPS_SQL.format(where=""))
+
+    @property
+    def version(self):
+        # data_version also changes when another process (the web app) commits
+        return self.writes, self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def transaction(self):
+        return _Transaction(self)
+
+    def _player_ids(self, names):
+        now = _timestamp(datetime.utcnow())
+        self.conn.executemany("INSERT OR IGNORE INTO player (username, score, created_at) VALUES (?, 0, ?)",
+                              [(name, now) for name in names])
+        ids = {}
+        for name in names:
+            ids[name] = self.conn.execute("SELECT id FROM player WHERE username = ?", (name,)).fetchone()[0]
+        return ids
+
+    def create_session(self, date, initial_buyin, names):
+        with self.transaction():
+            session_id = self.conn.execute(
+                "INSERT INTO poker_session (date, buy_in_amount, created_at) VALUES (?, ?, ?)",
+                (_timestamp(date), initial_buyin, _timestamp(datetime.utcnow()))
+            ).lastrowid
+            player_ids = self._player_ids(names)
+            self.conn.executemany(
+                "INSERT INTO session_player (session_id, player_id, total_buyins) VALUES (?, ?, ?)",
+                [(session_id, player_ids[name], initial_buyin) for name in names]
+            )
+        return session_id
+
+    def add_rebuy(self, session_key, name, amount):
+        with self.transaction():
+            self.conn.execute(
+                """UPDATE session_player
+                   SET total_buyins = COALESCE(total_buyins,
+                       (SELECT buy_in_amount FROM poker_session WHERE id = session_player.session_id), 0) + ?
+                   WHERE session_id = ? AND player_id = (SELECT id FROM player WHERE username = ?)""",
+                (amount, session_key, name)
+            )
+
+    def record_cashout(self, session_key, name, cash_out):
+        with self.transaction():
+            seat = self.conn.execute(
+                f"""SELECT sp.player_id, COALESCE(sp.total_buyins, s.buy_in_amount, 0), date(s.date), {PROFIT_SQL}
+                    FROM session_player sp
+                    JOIN poker_session s ON s.id = sp.session_id
+                    JOIN player p ON p.id = sp.player_id
+                    LEFT JOIN player_result r ON r.session_id = sp.session_id AND r.player_id = sp.player_id
+                    WHERE sp.session_id = ? AND p.username = ?""",
+                (session_key, name)
+            ).fetchone()
+            if seat is None:
+                # Same as JsonRepository: no such seat in that session
+                raise KeyError(name)
+            player_id, total_buyins, day, previous = seat
+            if previous is None:
+                self.conn.execute(
+                    "INSERT INTO player_result (session_id, player_id, final_amount, total_buyins) VALUES (?, ?, ?, ?)",
+                    (session_key, player_id, cash_out, total_buyins)
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE player_result SET final_amount = ?, total_buyins = ? WHERE session_id = ? AND player_id = ?",
+                    (cash_out, total_buyins, session_key, player_id)
+                )
+            self._apply_profit(player_id, day, cash_out - total_buyins, previous)
+
+    def _apply_profit(self, player_id, day, profit, previous=None):
+        # Incremental upkeep of the leaderboard and rollup rows for one
+        # result; ``previous`` is the profit it replaces, if any
+        if previous is None:
+            sessions, wins, delta = 1, int(profit > 0), profit
+        else:
+            sessions, wins, delta = 0, int(profit > 0) - int(previous > 0), profit - previous
+        params = {"player_id": player_id, "day": day, "sessions": sessions, "wins": wins,
+                  "delta": delta, "profit": profit, "previous": previous}
+        self.conn.execute(UPSERT_ROLLUP_SQL, params)
+        self.conn.execute(UPSERT_LEADERBOARD_SQL, params)
+        self.conn.execute(SHIFT_CUMULATIVE_SQL, params)
+        if previous is not None and previous != profit:
+            self.conn.execute(RESET_ROLLUP_EXTREMES_SQL, params)
+            self.conn.execute(RESET_LEADERBOARD_EXTREMES_SQL, params)
+
+    def rebuild_aggregates(self, player_ids=None):
+        # Recompute leaderboard and rollup rows for the given players (all if None)
+        if player_ids is None:
+            where, params = "", ()
+        else:
+            where = "WHERE r.player_id IN (%s)" % ",".join("?" * len(player_ids))
+            params = tuple(player_ids)
+        filter_sql = where.replace("r.player_id", "player_id")
+        self.conn.execute(f"DELETE FROM leaderboard_entry {filter_sql}", params)
+        self.conn.execute(f"DELETE FROM player_daily_rollup {filter_sql}", params)
+        self.conn.execute(REBUILD_LEADERBOARD_SQL.format(where=where), params)
+        self.conn.execute(REBUILD_ROLLUPS_SQL.format(where=where), params)
+
+    def get_session(self, session_key):
+        date, initial_buyin = self.conn.execute(
+            "SELECT date, buy_in_amount FROM poker_session WHERE id = ?", (session_key,)
+        ).fetchone()
+        return {
+            "date": date[:10],
+            "initial_buyin": initial_buyin,
+            "players": self._seats([session_key])[session_key]
+        }
+
+    def _seats(self, session_ids):
+        seats = {session_id: [] for session_id in session_ids}
+        rows = self.conn.execute(
+            f"""SELECT sp.session_id, p.username,
+                       COALESCE(sp.total_buyins, s.buy_in_amount, 0),
+                       r.final_amount, r.total_buyins
+                FROM session_player sp
+                JOIN player p ON p.id = sp.player_id
+                JOIN poker_session s ON s.id = sp.session_id
+                LEFT JOIN player_result r ON r.session_id = sp.session_id AND r.player_id = sp.player_id
+                WHERE sp.session_id IN ({",".join("?" * len(session_ids))})
+                ORDER BY sp.id""",
+            tuple(session_ids)
+        )
+        for session_id, name, total_buyins, final_amount, result_buyins in rows:
+            seats[session_id].append({
+                "name": name,
+                "total_buyins": total_buyins,
+                "cash_out": final_amount if final_amount is not None else 0,
+                "profit": final_amount - result_buyins if final_amount is not None else 0
+            })
+        return seats
+
+    def sessions(self, offset=0, limit=None):
+        rows = self.conn.execute(
+            "SELECT id, date, buy_in_amount FROM poker_session ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            (-1 if limit is None else limit, offset)
+        ).fetchall()
+        seats = self._seats([row[0] for row in rows]) if rows else {}
+        return [{"date": date[:10], "initial_buyin": buy_in, "players": seats[session_id]}
+                for session_id, date, buy_in in rows]
+
+    def player_names(self):
+        return [row[0] for row in self.conn.execute("SELECT username FROM player ORDER BY username")]
+
+    def leaderboard(self):
+        return self.conn.execute(
+            """SELECT p.username, l.total_profit, l.sessions
+               FROM leaderboard_entry l JOIN player p ON p.id = l.player_id
+               ORDER BY l.total_profit DESC"""
+        ).fetchall()
+
+    def player_stats(self, name):
+        row = self.conn.execute(
+            """SELECT p.id, l.sessions, l.total_profit, l.best_result, l.worst_result
+               FROM player p LEFT JOIN leaderboard_entry l ON l.player_id = p.id
+               WHERE p.username = ?""",
+            (name,)
+        ).fetchone()
+        if row is None or row[1] is None:
+            return {"total_sessions": 0, "total_profit": 0, "biggest_win": 0, "biggest_loss": 0, "history": []}
+        player_id, sessions, total_profit, best, worst = row
+        history = self.conn.execute(
+            f"""SELECT substr(s.date, 1, 10), {PROFIT_SQL}
+                FROM player_result r JOIN poker_session s ON s.id = r.session_id
+                WHERE r.player_id = ?
+                ORDER BY s.date DESC""",
+            (player_id,)
+        ).fetchall()
+        return {
+            "total_sessions": sessions,
+            "total_profit": total_profit,
+            "biggest_win": max(best, 0),
+            "biggest_loss": min(worst, 0),
+            "history": history
+        }
+
+
+class _Transaction:
+    def __init__(self, repository):
+        self.repository = repository
+
+    def __enter__(self):
+        self.repository.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.repository.conn.execute("COMMIT")
+            self.repository.writes += 1
+            if self.repository.on_status is not None:
+                self.repository.on_status("saved", 1)
+            with open(change_marker_path(self.repository.db_path), "a"):
+                os.utime(change_marker_path(self.repository.db_path))
+        else:
+            self.repository.conn.execute("ROLLBACK")
+        return False
+
+
+def _timestamp(value):
+    # Same text format SQLAlchemy uses for DateTime columns on SQLite
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%d")
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def migrate_json(data_file, db_path):
+    """Copy a poker_data.json history (and its journal) into SQLite.
+
+    Runs as a single transaction with executemany inserts, then rebuilds
+    the leaderboard and rollup tables once. Returns (sessions, results).
+    """
+    source = JsonRepository(data_file)
+    source.load()
+    # A .pkr snapshot is read through mmap, so the source stays open
+    # until every session has been copied
+    sessions = source.data["sessions"]
+
+    target = SQLiteRepository(db_path)
+    try:
+        target.load()
+        with target.transaction():
+            names = sorted({player["name"] for session in sessions for player in session["players"]})
+            player_ids = target._player_ids(names)
+            now = _timestamp(datetime.utcnow())
+            seats = []
+            results = []
+            for session in sessions:
+                session_id = target.conn.execute(
+                    "INSERT INTO poker_session (date, buy_in_amount, created_at) VALUES (?, ?, ?)",
+                    (_timestamp(session["date"]), session["initial_buyin"], now)
+                ).lastrowid
+                for player in session["players"]:
+                    player_id = player_ids[player["name"]]
+                    seats.append((session_id, player_id, player["total_buyins"]))
+                    if has_result(player):
+                        results.append((session_id, player_id, player["cash_out"],
+                                        player["cash_out"] - player["profit"]))
+            target.conn.executemany(
+                "INSERT INTO session_player (session_id, player_id, total_buyins) VALUES (?, ?, ?)", seats
+            )
+            target.conn.executemany(
+                "INSERT INTO player_result (session_id, player_id, final_amount, total_buyins) VALUES (?, ?, ?, ?)",
+                results
+            )
+            target.rebuild_aggregates(list(set(player_ids.values())))
+        session_count = len(sessions)
+    finally:
+        target.close()
+        source.close()
+    return session_count, len(results)
+
+
+def open_repository(data_file, on_status=None):
+    # POKER_DB points the desktop app at a SQLite database, e.g. the web
+    # app's instance/poker_tracker.db; otherwise keep using the JSON file
+    db_path = os.environ.get("POKER_DB")
+    if db_path:
+        return SQLiteRepository(db_path, on_status)
+    return JsonRepository(data_file, on_status)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python poker_repository.py poker_data.json path/to/poker_tracker.db")
+        sys.exit(1)
+    session_count, result_count = migrate_json(sys.argv[1], sys.argv[2])
+    print(f"Migrated {session_count} sessions and {result_count} results into {sys.argv[2]}")
@@ -1,9 +1,61 @@
+import os
+import queue
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import json
-import os
 from datetime import datetime
 import tkcalendar
+from poker_repository import open_repository
+
+class ScreenManager:
+    """Builds each screen once and switches between them by packing and
+    unpacking their frames.
+
+    A screen is registered with a ``build(frame)`` function that creates
+    its widgets and returns a ``refresh(*args)`` function (or None) that
+    updates only the data-bound ones. ``refresh`` is skipped when neither
+    the arguments nor the repository version changed since the last show.
+    ``on_switch(name, seconds)`` is called after every switch.
+    """
+
+    def __init__(self, container, version, on_switch=None):
+        self.container = container
+        self.version = version
+        self.on_switch = on_switch
+        self.builders = {}
+        self.screens = {}
+        self.shown_with = {}
+        self.current = None
+
+    def register(self, name, build):
+        self.builders[name] = build
+
+    def show(self, name, *args):
+        start = time.perf_counter()
+        if name not in self.screens:
+            frame = ttk.Frame(self.container, style="Main.TFrame")
+            self.screens[name] = (frame, self.builders[name](frame))
+        frame, refresh = self.screens[name]
+        self.refresh(name, *args)
+
+        if self.current != name:
+            if self.current is not None:
+                self.screens[self.current][0].pack_forget()
+            frame.pack(fill=tk.BOTH, expand=True)
+            self.current = name
+        frame.update_idletasks()
+
+        if self.on_switch is not None:
+            self.on_switch(name, time.perf_counter() - start)
+
+    def refresh(self, name, *args, force=False):
+        if name not in self.screens:
+            return
+        refresh = self.screens[name][1]
+        key = (self.version(), args)
+        if refresh is not None and (force or self.shown_with.get(name) != key):
+            refresh(*args)
+            self.shown_with[name] = key
 
 class PokerTracker:
     def __init__(self, root):
@@ -59,16 +111,41 @@ class PokerTracker:
             background=[("active", self.button_hover)]
         )
         
+        # Save status bar
+        self.save_status = tk.StringVar(value="")
+        self.save_events = queue.Queue()
+        status_label = ttk.Label(root, textvariable=self.save_status, anchor="e",
+                                 background=self.bg_color, foreground="#757575")
+        status_label.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 5))
+        
         # Create main container
         self.container = ttk.Frame(root, style="Main.TFrame")
         self.container.pack(fill=tk.BOTH, expand=True, padx=40, pady=40)
         
-        # Show main screen
-        self.show_main_screen()
-        
         # Load data
-        self.data_file = "poker_data.json"
+        # A compact binary snapshot is used once one has been converted;
+        # see binary_snapshot.py
+        self.data_file = "poker_data.pkr" if os.path.exists("poker_data.pkr") else "poker_data.json"
+        self.sessions_page_size = 50
+        self.repo = open_repository(self.data_file, on_status=self.report_save_status)
         self.load_data()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after(100, self.poll_save_status)
+        
+        # Screens are built on first use and kept
+        self.switch_timings = {}
+        self.screens = ScreenManager(self.container, lambda: self.repo.version,
+                                     on_switch=self.record_switch)
+        self.screens.register("main", self.build_main_screen)
+        self.screens.register("new_session", self.build_new_session_screen)
+        self.screens.register("manage_session", self.build_manage_session_screen)
+        self.screens.register("leaderboard", self.build_leaderboard_screen)
+        self.screens.register("select_player", self.build_select_player_screen)
+        self.screens.register("player_stats", self.build_player_stats_screen)
+        self.screens.register("past_sessions", self.build_past_sessions_screen)
+        
+        # Show main screen
+        self.show_main_screen()
     
     def create_main_buttons(self, parent):
         buttons = [
@@ -84,19 +161,41 @@ class PokerTracker:
             button.pack(pady=15)
     
     def load_data(self):
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                self.data = json.load(f)
+        # JSON journal or the shared SQLite database; see poker_repository.py
+        self.repo.load()
+    
+    def on_close(self):
+        # Blocks until queued changes are on disk
+        self.save_status.set("Saving...")
+        self.root.update_idletasks()
+        self.repo.close()
+        self.root.destroy()
+    
+    def report_save_status(self, state, detail):
+        # Called from the persistence thread, which must not touch Tk
+        self.save_events.put((state, detail))
+    
+    def poll_save_status(self):
+        try:
+            while True:
+                self.show_save_status(*self.save_events.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_save_status)
+    
+    def show_save_status(self, state, detail):
+        if state == "saving":
+            self.save_status.set("Saving...")
+        elif state == "saved":
+            self.save_status.set(f"All changes saved at {datetime.now().strftime('%H:%M:%S')}")
         else:
-            self.data = {
-                "players": {},
-                "sessions": []
-            }
-            self.save_data()
+            self.save_status.set(f"Save failed, will retry: {detail}")
     
-    def save_data(self):
-        with open(self.data_file, 'w') as f:
-            json.dump(self.data, f, indent=4)
+    def record_switch(self, name, seconds):
+        # Last switch time per screen; set POKER_SCREEN_TIMINGS=1 to print them
+        self.switch_timings[name] = seconds
+        if os.environ.get("POKER_SCREEN_TIMINGS"):
+            print(f"screen {name}: {seconds * 1000:.1f} ms")
     
     def create_section_frame(self, parent, title):
         frame = ttk.Frame(parent, style="Main.TFrame")
@@ -108,6 +207,7 @@ class PokerTracker:
                             background=self.bg_color,
                             foreground=self.accent_color)
             label.pack(anchor="w", pady=(0, 15))
+            frame.title_label = label
         
         return frame
     
@@ -127,14 +227,18 @@ class PokerTracker:
         
         return entry
     
+    def create_back_button(self, parent, **kwargs):
+        back_button = ttk.Button(parent, text="← Back", 
+                               command=self.show_main_screen, **kwargs)
+        back_button.pack(anchor="nw", pady=10)
+        return back_button
+    
     def start_new_session(self):
-        # Clear main frame
-        for widget in self.container.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != self.container.winfo_children()[0]:
-                widget.destroy()
-        
+        self.screens.show("new_session")
+    
+    def build_new_session_screen(self, parent):
         # Create master frame for centering
-        master_frame = ttk.Frame(self.container, style="Main.TFrame")
+        master_frame = ttk.Frame(parent, style="Main.TFrame")
         master_frame.pack(expand=True, fill=tk.BOTH, padx=20, pady=20)
         
         # Create back button
@@ -212,104 +316,113 @@ class PokerTracker:
             messagebox.showerror("Error", "Please add at least one player")
             return
         
-        # Create session data
-        session_data = {
-            "date": date,
-            "initial_buyin": buyin,
-            "players": []
-        }
+        session_key = self.repo.create_session(date, buyin, players)
         
-        for player in players:
-            session_data["players"].append({
-                "name": player,
-                "total_buyins": buyin,
-                "cash_out": 0,
-                "profit": 0
-            })
-        
-        self.data["sessions"].append(session_data)
-        self.save_data()
+        # The form is reused, so clear it for the next session
+        self.buyin_entry.delete(0, tk.END)
+        self.player_entry.delete(0, tk.END)
+        self.players_listbox.delete(0, tk.END)
         
         # Show session management screen
-        self.manage_session(session_data)
+        self.manage_session(session_key)
     
-    def manage_session(self, session_data):
-        # Clear main frame
-        for widget in self.container.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != self.container.winfo_children()[0]:
-                widget.destroy()
-        
-        # Create back button
-        back_button = ttk.Button(self.container, text="← Back", 
-                               command=self.show_main_screen)
-        back_button.pack(anchor="nw", pady=10)
+    def manage_session(self, session_key):
+        self.screens.show("manage_session", session_key)
+    
+    def build_manage_session_screen(self, parent):
+        self.create_back_button(parent)
         
         # Session info frame
-        info_frame = self.create_section_frame(self.container, "Session Info")
-        ttk.Label(info_frame, text=f"Date: {session_data['date']}").pack(anchor="w")
-        ttk.Label(info_frame, text=f"Initial Buy-In: ${session_data['initial_buyin']}").pack(anchor="w")
+        info_frame = self.create_section_frame(parent, "Session Info")
+        date_label = ttk.Label(info_frame)
+        date_label.pack(anchor="w")
+        buyin_label = ttk.Label(info_frame)
+        buyin_label.pack(anchor="w")
         
         # Players frame
-        players_frame = self.create_section_frame(self.container, "Active Players")
+        players_frame = self.create_section_frame(parent, "Active Players")
+        
+        # Player rows are pooled; a session with fewer players hides the rest
+        rows = []
+        state = {"session_key": None, "players": []}
         
-        for player in session_data["players"]:
+        def create_row(index):
             player_frame = ttk.Frame(players_frame, style="Main.TFrame")
-            player_frame.pack(fill=tk.X, pady=5)
             
             # Player info
             info_frame = ttk.Frame(player_frame, style="Main.TFrame")
             info_frame.pack(side=tk.LEFT, padx=5)
             
-            ttk.Label(info_frame, text=player["name"], width=15, anchor="w").pack(side=tk.LEFT)
-            ttk.Label(info_frame, text=f"Buy-Ins: ${player['total_buyins']}").pack(side=tk.LEFT, padx=5)
+            name_label = ttk.Label(info_frame, width=15, anchor="w")
+            name_label.pack(side=tk.LEFT)
+            buyins_label = ttk.Label(info_frame)
+            buyins_label.pack(side=tk.LEFT, padx=5)
             
             # Actions frame
             actions_frame = ttk.Frame(player_frame, style="Main.TFrame")
             actions_frame.pack(side=tk.RIGHT, padx=5)
             
             rebuy_button = ttk.Button(actions_frame, text="Add Rebuy",
-                                    command=lambda p=player: self.add_rebuy(p))
+                                    command=lambda: self.add_rebuy(state["session_key"], state["players"][index]))
             rebuy_button.pack(side=tk.LEFT, padx=5)
             
             cashout_entry = ttk.Entry(actions_frame, width=10)
             cashout_entry.pack(side=tk.LEFT, padx=5)
             
             save_button = ttk.Button(actions_frame, text="Save Cash Out",
-                                   command=lambda p=player, e=cashout_entry: self.save_cashout(p, e))
+                                   command=lambda: self.save_cashout(state["session_key"], state["players"][index],
+                                                                     cashout_entry))
             save_button.pack(side=tk.LEFT, padx=5)
+            return player_frame, name_label, buyins_label, cashout_entry
+        
+        def refresh(session_key):
+            session_data = self.repo.get_session(session_key)
+            new_session = session_key != state["session_key"]
+            state["session_key"] = session_key
+            state["players"] = session_data["players"]
+            date_label.configure(text=f"Date: {session_data['date']}")
+            buyin_label.configure(text=f"Initial Buy-In: ${session_data['initial_buyin']}")
+            
+            while len(rows) < len(session_data["players"]):
+                rows.append(create_row(len(rows)))
+            for index, (player_frame, name_label, buyins_label, cashout_entry) in enumerate(rows):
+                if index >= len(session_data["players"]):
+                    player_frame.pack_forget()
+                    continue
+                player = session_data["players"][index]
+                name_label.configure(text=player["name"])
+                buyins_label.configure(text=f"Buy-Ins: ${player['total_buyins']}")
+                if new_session:
+                    cashout_entry.delete(0, tk.END)
+                player_frame.pack(fill=tk.X, pady=5)
+        
+        return refresh
     
-    def add_rebuy(self, player):
+    def add_rebuy(self, session_key, player):
         try:
             rebuy_amount = float(simpledialog.askstring("Add Rebuy", 
                                                       f"Enter rebuy amount for {player['name']}:"))
             if rebuy_amount > 0:
-                player["total_buyins"] += rebuy_amount
-                self.save_data()
+                self.repo.add_rebuy(session_key, player["name"], rebuy_amount)
+                self.screens.refresh("manage_session", session_key)
         except (ValueError, TypeError):
             messagebox.showerror("Error", "Please enter a valid amount")
     
-    def save_cashout(self, player, entry):
+    def save_cashout(self, session_key, player, entry):
         try:
             cashout = float(entry.get())
-            player["cash_out"] = cashout
-            player["profit"] = cashout - player["total_buyins"]
-            self.save_data()
+            self.repo.record_cashout(session_key, player["name"], cashout)
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid amount")
     
     def view_leaderboard(self):
-        # Clear main frame
-        for widget in self.container.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != self.container.winfo_children()[0]:
-                widget.destroy()
-        
-        # Create back button
-        back_button = ttk.Button(self.container, text="← Back", 
-                               command=self.show_main_screen)
-        back_button.pack(anchor="nw", pady=10)
+        self.screens.show("leaderboard")
+    
+    def build_leaderboard_screen(self, parent):
+        self.create_back_button(parent)
         
         # Create leaderboard frame
-        leaderboard_frame = self.create_section_frame(self.container, "Leaderboard")
+        leaderboard_frame = self.create_section_frame(parent, "Leaderboard")
         
         # Create leaderboard table
         tree = ttk.Treeview(leaderboard_frame, columns=("Name", "Profit/Loss", "Sessions"), 
@@ -323,100 +436,61 @@ class PokerTracker:
         tree.column("Profit/Loss", width=150)
         tree.column("Sessions", width=100)
         
-        # Calculate player stats
-        player_stats = {}
-        for session in self.data["sessions"]:
-            for player in session["players"]:
-                name = player["name"]
-                if name not in player_stats:
-                    player_stats[name] = {"profit": 0, "sessions": 0}
-                player_stats[name]["profit"] += player["profit"]
-                player_stats[name]["sessions"] += 1
-        
-        # Sort players by profit
-        sorted_players = sorted(player_stats.items(), 
-                              key=lambda x: x[1]["profit"], 
-                              reverse=True)
+        tree.pack(fill=tk.X, pady=10)
         
-        for name, stats in sorted_players:
-            tree.insert("", tk.END, values=(name, f"${stats['profit']:.2f}", stats["sessions"]))
+        def refresh():
+            tree.delete(*tree.get_children())
+            # Already sorted by profit
+            for name, profit, sessions in self.repo.leaderboard():
+                tree.insert("", tk.END, values=(name, f"${profit:.2f}", sessions))
         
-        tree.pack(fill=tk.X, pady=10)
+        return refresh
     
     def view_player_stats(self):
-        # Clear main frame
-        for widget in self.container.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != self.container.winfo_children()[0]:
-                widget.destroy()
-        
-        # Create back button
-        back_button = ttk.Button(self.container, text="← Back", 
-                               command=self.show_main_screen)
-        back_button.pack(anchor="nw", pady=10)
+        self.screens.show("select_player")
+    
+    def build_select_player_screen(self, parent):
+        self.create_back_button(parent)
         
         # Create player selection frame
-        selection_frame = self.create_section_frame(self.container, "Select Player")
-        
-        # Get unique players
-        players = set()
-        for session in self.data["sessions"]:
-            for player in session["players"]:
-                players.add(player["name"])
+        selection_frame = self.create_section_frame(parent, "Select Player")
         
         player_var = tk.StringVar()
         player_dropdown = ttk.Combobox(selection_frame, textvariable=player_var,
-                                     values=sorted(players), state="readonly",
-                                     width=20)
+                                     state="readonly", width=20)
         player_dropdown.pack(side=tk.LEFT, padx=5)
         
         view_button = ttk.Button(selection_frame, text="View Stats",
                                command=lambda: self.show_player_stats(player_var.get()))
         view_button.pack(side=tk.LEFT, padx=5)
+        
+        def refresh():
+            player_dropdown.configure(values=self.repo.player_names())
+        
+        return refresh
     
     def show_player_stats(self, player_name):
-        # Clear previous stats if any
-        for widget in self.container.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != self.container.winfo_children()[0]:
-                widget.destroy()
-        
-        # Calculate player stats
-        total_sessions = 0
-        total_profit = 0
-        biggest_win = 0
-        biggest_loss = 0
-        session_history = []
-        
-        for session in self.data["sessions"]:
-            for player in session["players"]:
-                if player["name"] == player_name:
-                    total_sessions += 1
-                    total_profit += player["profit"]
-                    biggest_win = max(biggest_win, player["profit"])
-                    biggest_loss = min(biggest_loss, player["profit"])
-                    session_history.append({
-                        "date": session["date"],
-                        "profit": player["profit"]
-                    })
+        self.screens.show("player_stats", player_name)
+    
+    def build_player_stats_screen(self, parent):
+        self.create_back_button(parent)
         
         # Create stats frame
-        stats_frame = self.create_section_frame(self.container, f"Statistics for {player_name}")
-        
-        stats = [
-            ("Total Sessions Played", str(total_sessions)),
-            ("Total Profit/Loss", f"${total_profit:.2f}"),
-            ("Average Profit/Loss per Session", f"${total_profit/total_sessions:.2f}" if total_sessions > 0 else "$0.00"),
-            ("Biggest Win", f"${biggest_win:.2f}"),
-            ("Biggest Loss", f"${biggest_loss:.2f}")
-        ]
+        stats_frame = self.create_section_frame(parent, "Statistics")
         
-        for label, value in stats:
+        labels = ["Total Sessions Played", "Total Profit/Loss", "Average Profit/Loss per Session",
+                  "Biggest Win", "Biggest Loss"]
+        value_labels = []
+        for label in labels:
             frame = ttk.Frame(stats_frame, style="Main.TFrame")
             frame.pack(fill=tk.X, pady=5)
             ttk.Label(frame, text=label, width=25, anchor="w").pack(side=tk.LEFT)
-            ttk.Label(frame, text=value).pack(side=tk.LEFT)
+            value_label = ttk.Label(frame)
+            value_label.pack(side=tk.LEFT)
+            value_labels.append(value_label)
         
         # Create session history frame
-        history_frame = self.create_section_frame(self.container, "Session History")
+        history_frame = self.create_section_frame(parent, "Session History")
         
         tree = ttk.Treeview(history_frame, columns=("Date", "Profit/Loss"), 
                           show="headings", height=10)
@@ -427,60 +501,97 @@ class PokerTracker:
         tree.column("Date", width=150)
         tree.column("Profit/Loss", width=150)
         
-        for session in sorted(session_history, key=lambda x: x["date"], reverse=True):
-            tree.insert("", tk.END, values=(session["date"], f"${session['profit']:.2f}"))
-        
         tree.pack(fill=tk.X, pady=10)
+        
+        def refresh(player_name):
+            player_stats = self.repo.player_stats(player_name)
+            total_sessions = player_stats["total_sessions"]
+            total_profit = player_stats["total_profit"]
+            
+            stats_frame.title_label.configure(text=f"Statistics for {player_name}")
+            values = [
+                str(total_sessions),
+                f"${total_profit:.2f}",
+                f"${total_profit/total_sessions:.2f}" if total_sessions > 0 else "$0.00",
+                f"${player_stats['biggest_win']:.2f}",
+                f"${player_stats['biggest_loss']:.2f}"
+            ]
+            for value_label, value in zip(value_labels, values):
+                value_label.configure(text=value)
+            
+            tree.delete(*tree.get_children())
+            # Newest first
+            for date, profit in player_stats["history"]:
+                tree.insert("", tk.END, values=(date, f"${profit:.2f}"))
+        
+        return refresh
     
     def view_past_sessions(self):
-        # Clear main frame
-        for widget in self.container.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != self.container.winfo_children()[0]:
-                widget.destroy()
-        
-        # Create back button
-        back_button = ttk.Button(self.container, text="← Back", 
-                               command=self.show_main_screen)
-        back_button.pack(anchor="nw", pady=10)
+        self.screens.show("past_sessions")
+    
+    def build_past_sessions_screen(self, parent):
+        self.create_back_button(parent)
         
         # Create sessions frame
-        sessions_frame = self.create_section_frame(self.container, "Past Sessions")
+        sessions_frame = self.create_section_frame(parent, "Past Sessions")
+        
+        # One tree row per session with its players as children; pages are
+        # fetched from the repository as the list is scrolled, so opening the
+        # view costs the same however long the history is
+        tree = ttk.Treeview(sessions_frame, columns=("Buy-Ins", "Cash Out", "Profit/Loss"),
+                          height=20)
+        tree.heading("#0", text="Session / Player")
+        tree.heading("Buy-Ins", text="Buy-Ins")
+        tree.heading("Cash Out", text="Cash Out")
+        tree.heading("Profit/Loss", text="Profit/Loss")
         
-        for session in sorted(self.data["sessions"], 
-                            key=lambda x: x["date"], 
-                            reverse=True):
-            session_frame = ttk.Frame(sessions_frame, style="Main.TFrame")
-            session_frame.pack(fill=tk.X, pady=10)
-            
-            # Session info
-            info_frame = ttk.Frame(session_frame, style="Main.TFrame")
-            info_frame.pack(fill=tk.X, pady=5)
-            
-            ttk.Label(info_frame, text=f"Date: {session['date']}", 
-                     font=("Segoe UI", 12, "bold")).pack(anchor="w")
-            ttk.Label(info_frame, text=f"Initial Buy-In: ${session['initial_buyin']}").pack(anchor="w")
-            
-            # Players info
-            for player in session["players"]:
-                player_frame = ttk.Frame(session_frame, style="Main.TFrame")
-                player_frame.pack(fill=tk.X, pady=2)
-                
-                ttk.Label(player_frame, text=f"{player['name']}:", 
-                         width=15, anchor="w").pack(side=tk.LEFT)
-                ttk.Label(player_frame, text=f"Buy-Ins: ${player['total_buyins']}").pack(side=tk.LEFT, padx=5)
-                ttk.Label(player_frame, text=f"Cash Out: ${player['cash_out']}").pack(side=tk.LEFT, padx=5)
-                ttk.Label(player_frame, text=f"Profit/Loss: ${player['profit']}").pack(side=tk.LEFT, padx=5)
-            
-            ttk.Separator(sessions_frame, orient="horizontal").pack(fill=tk.X, pady=10)
+        # Set column widths
+        tree.column("#0", width=220)
+        tree.column("Buy-Ins", width=120)
+        tree.column("Cash Out", width=120)
+        tree.column("Profit/Loss", width=120)
+        
+        scrollbar = ttk.Scrollbar(sessions_frame, orient="vertical", command=tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True, pady=10)
+        
+        state = {"offset": 0, "done": True}
+        
+        def load_page():
+            page = self.repo.sessions(state["offset"], self.sessions_page_size)
+            state["offset"] += len(page)
+            state["done"] = len(page) < self.sessions_page_size
+            for session in page:
+                parent = tree.insert("", tk.END, open=True,
+                                     text=f"{session['date']}  (Initial Buy-In: ${session['initial_buyin']})")
+                for player in session["players"]:
+                    tree.insert(parent, tk.END, text=player["name"],
+                                values=(f"${player['total_buyins']}", f"${player['cash_out']}",
+                                        f"${player['profit']}"))
+        
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            # Fetch the next page once the bottom of the list comes into view
+            if not state["done"] and float(last) > 0.9:
+                load_page()
+        
+        tree.configure(yscrollcommand=on_scroll)
+        
+        def refresh():
+            state["done"] = True
+            tree.delete(*tree.get_children())
+            state["offset"] = 0
+            load_page()
+            tree.yview_moveto(0)
+        
+        return refresh
     
     def show_main_screen(self):
-        # Clear main frame
-        for widget in self.container.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != self.container.winfo_children()[0]:
-                widget.destroy()
-        
+        self.screens.show("main")
+    
+    def build_main_screen(self, parent):
         # Create title frame
-        title_frame = ttk.Frame(self.container, style="Main.TFrame")
+        title_frame = ttk.Frame(parent, style="Main.TFrame")
         title_frame.pack(fill=tk.X, pady=(0, 30))  # 30px padding below title
         
         # Create title
@@ -489,7 +600,7 @@ class PokerTracker:
         title_label.pack()
         
         # Create button frame
-        button_frame = ttk.Frame(self.container, style="Main.TFrame")
+        button_frame = ttk.Frame(parent, style="Main.TFrame")
         button_frame.pack(fill=tk.X, pady=(0, 20))
         
         # Create buttons with proper spacing
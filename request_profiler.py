@@ -0,0 +1,190 @@
+import bisect
+import heapq
+import logging
+import threading
+import time
+
+from flask import g, has_request_context, jsonify, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+LOCAL_ADDRESSES = {'127.0.0.1', '::1'}
+
+
+def is_local_request():
+    # A proxy on the same machine would make every client look local
+    return request.remote_addr in LOCAL_ADDRESSES and not request.headers.get('X-Forwarded-For')
+
+
+def _shorten(statement, limit=500):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + '...'
+
+
+class RouteStats:
+    __slots__ = ('counts', 'requests', 'total', 'max', 'queries', 'db_time', 'slowest')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.requests = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest = {}
+
+    def add(self, elapsed, profile, keep):
+        elapsed_ms = elapsed * 1000
+        self.counts[bisect.bisect_left(BUCKETS, elapsed_ms)] += 1
+        self.requests += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.queries += profile.queries
+        self.db_time += profile.db_time
+        # Slowest run of each statement, so one hot query can't fill the list
+        for duration, statement in profile.slowest:
+            if duration > self.slowest.get(statement, 0):
+                self.slowest[statement] = duration
+        while len(self.slowest) > keep:
+            del self.slowest[min(self.slowest, key=self.slowest.get)]
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding that fraction of requests
+        target = fraction * self.requests
+        seen = 0
+        for bound, count in zip(BUCKETS + (None,), self.counts):
+            seen += count
+            if seen >= target:
+                return bound if bound is not None else round(self.max * 1000, 1)
+        return None
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'mean_ms': round(self.total / self.requests * 1000, 2),
+            'max_ms': round(self.max * 1000, 2),
+            'p50_ms': self.percentile(0.5),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'queries_per_request': round(self.queries / self.requests, 2),
+            'db_ms_per_request': round(self.db_time / self.requests * 1000, 2),
+            'histogram': [
+                {'le_ms': bound if bound is not None else 'inf', 'count': count}
+                for bound, count in zip(BUCKETS + (None,), self.counts)
+            ],
+            'slowest': [
+                {'ms': round(duration * 1000, 2), 'statement': statement}
+                for statement, duration in sorted(self.slowest.items(), key=lambda item: item[1], reverse=True)
+            ]
+        }
+
+
+class RequestProfile:
+    __slots__ = ('started', 'queries', 'db_time', 'slowest')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest = []
+
+
+class RequestProfiler:
+    """Per-request SQL timing from the engine's cursor events.
+
+    Every statement run while handling a request is counted and timed
+    against that request. The response gets a ``Server-Timing`` header
+    (database time and query count, plus total time), statements slower
+    than ``slow_query_ms`` are logged, and each route keeps a latency
+    histogram with its slowest statements for ``/debug/metrics``, which
+    only answers requests from the local machine.
+
+    Statements from outside a request (background writers, CLI commands)
+    are timed for the slow-query log but not attributed to any route.
+    """
+
+    def __init__(self, app=None, db=None, slow_query_ms=100, slowest=5):
+        self.lock = threading.Lock()
+        self.slow_query = slow_query_ms / 1000
+        self.keep = slowest
+        self.routes = {}
+        self.slow_queries = 0
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.extensions['request_profiler'] = self
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+        event.listen(engine, 'handle_error', self._discard)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule('/debug/metrics', 'debug_metrics', self._metrics_view)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        endpoint = None
+        if has_request_context():
+            endpoint = request.endpoint
+            profile = g.get('profile')
+            if profile is not None:
+                profile.queries += 1
+                profile.db_time += elapsed
+                if len(profile.slowest) < self.keep:
+                    heapq.heappush(profile.slowest, (elapsed, statement))
+                elif elapsed > profile.slowest[0][0]:
+                    heapq.heapreplace(profile.slowest, (elapsed, statement))
+        if elapsed >= self.slow_query:
+            with self.lock:
+                self.slow_queries += 1
+            logger.warning('Slow query (%.1f ms, %s): %s', elapsed * 1000, endpoint or 'no request',
+                           _shorten(statement))
+
+    def _discard(self, exception_context):
+        # A failed statement never reaches after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('query_started'):
+            connection.info['query_started'].pop()
+
+    def _start(self):
+        g.profile = RequestProfile()
+
+    def _finish(self, response):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return response
+        elapsed = time.perf_counter() - profile.started
+        response.headers.add('Server-Timing', 'db;dur=%.2f;desc="%d queries"' % (profile.db_time * 1000, profile.queries))
+        response.headers.add('Server-Timing', 'total;dur=%.2f' % (elapsed * 1000))
+
+        profile.slowest = [(duration, _shorten(statement)) for duration, statement in profile.slowest]
+        key = '%s %s' % (request.method, request.url_rule.rule if request.url_rule else 'unmatched')
+        with self.lock:
+            stats = self.routes.get(key)
+            if stats is None:
+                stats = self.routes[key] = RouteStats()
+            stats.add(elapsed, profile, self.keep)
+        return response
+
+    def stats(self):
+        with self.lock:
+            return {
+                'slow_query_ms': self.slow_query * 1000,
+                'slow_queries': self.slow_queries,
+                'routes': {key: stats.to_dict() for key, stats in sorted(self.routes.items())}
+            }
+
+    def _metrics_view(self):
+        # Statement text and timings are for whoever runs the server, so
+        # anything arriving from off the machine gets a plain 404
+        if not is_local_request():
+            return jsonify({'error': 'Not found'}), 404
+        return jsonify(self.stats())
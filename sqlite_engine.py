@@ -0,0 +1,101 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Applied to every new DBAPI connection. WAL lets readers keep going while a
+# writer commits, and NORMAL sync is safe under WAL (only the last
+# transactions can be lost on power failure, never corrupted).
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait):
+        with self.lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_timeout(self):
+        with self.lock:
+            self.timeouts += 1
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def is_memory_database(uri):
+    url = make_url(uri)
+    return url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:')
+
+
+def engine_options(uri, pool_size=10, max_overflow=20, pool_timeout=10):
+    # In-memory databases share a single StaticPool connection (set up by
+    # Flask-SQLAlchemy), so there is nothing to tune
+    if is_memory_database(uri):
+        return {}
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+    }
+
+
+def configure(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__, 'status': pool.status()}
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        with metrics.lock:
+            stats.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'checkouts': metrics.checkouts,
+                'timeouts': metrics.timeouts,
+                'avg_wait_ms': round(metrics.total_wait / metrics.checkouts * 1000, 3) if metrics.checkouts else 0,
+                'max_wait_ms': round(metrics.max_wait * 1000, 3),
+            })
+    return stats
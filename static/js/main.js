@@ -7,6 +7,7 @@ document.addEventListener('DOMContentLoaded', () => {
     setupProfileModal();
     setupProfilePictureChange();
     setupFriendSystem();
+    setupLiveUpdates();
 });
 
 // Navigation setup
@@ -169,9 +170,9 @@ function updateProfitChart(data) {
         window.profitChart.destroy();
     }
 
-    // Calculate cumulative profit
+    // The server sends running totals; older responses only had the daily values
     let runningTotal = 0;
-    const cumulativeData = data.data.map(value => {
+    const cumulativeData = data.cumulative || data.data.map(value => {
         runningTotal += value;
         return runningTotal;
     });
@@ -182,7 +183,8 @@ function updateProfitChart(data) {
             labels: data.labels,
             datasets: [
                 {
-                    label: 'Daily Profit/Loss',
+                    label: data.resolution === 'week' ? 'Weekly Profit/Loss'
+                        : data.resolution === 'month' ? 'Monthly Profit/Loss' : 'Daily Profit/Loss',
                     data: data.data,
                     borderColor: 'rgba(75, 192, 192, 0.5)',
                     backgroundColor: 'rgba(75, 192, 192, 0.1)',
@@ -326,8 +328,49 @@ function updateDashboardLeaderboard(data) {
     }
 }
 
-// Refresh leaderboard every minute
-setInterval(fetchLeaderboard, 60000);
+// Live updates pushed by the server; fall back to polling without EventSource
+function setupLiveUpdates() {
+    if (!window.EventSource) {
+        setInterval(fetchLeaderboard, 60000);
+        return;
+    }
+
+    const events = new EventSource('/api/events');
+    events.addEventListener('leaderboard', (e) => {
+        const data = JSON.parse(e.data);
+        updateLeaderboard(data);
+        updateDashboardLeaderboard(data);
+    });
+    events.addEventListener('results', () => loadDashboard(currentDashboardDays()));
+    events.addEventListener('friend_request', () => loadFriendRequests());
+    events.addEventListener('friends', () => loadFriends());
+    // Uploaded avatars are resized in the background
+    events.addEventListener('avatar', (e) => {
+        const data = JSON.parse(e.data);
+        if (data.error) {
+            alert(`Avatar upload failed: ${data.error}`);
+            return;
+        }
+        ['current-avatar', 'nav-profile-pic', 'dashboard-profile-pic'].forEach(id => {
+            const image = document.getElementById(id);
+            if (image) {
+                image.src = `/static/uploads/${data.avatar}`;
+            }
+        });
+    });
+    // Too far behind to replay what was missed: reload everything
+    events.addEventListener('reset', () => {
+        fetchLeaderboard();
+        loadDashboard(currentDashboardDays());
+        loadFriends();
+        loadFriendRequests();
+    });
+}
+
+function currentDashboardDays() {
+    const active = document.querySelector('.time-filters .btn.active');
+    return active ? parseInt(active.dataset.days) : 1;
+}
 
 // Profile Modal Setup
 function setupProfileModal() {
@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# The modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app reads these at import time
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='poker-tests-'), 'test.db'))
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+@pytest.fixture
+def web():
+    import app as web
+
+    with web.app.app_context():
+        web.db.drop_all()
+        web.db.create_all()
+    web.user_cache.clear()
+    web.app.config['TESTING'] = True
+    yield web
+    with web.app.app_context():
+        web.db.session.remove()
+
+
+@pytest.fixture
+def count_queries(web):
+    """count_queries(client, path) -> (response, statements run for it)."""
+    from sqlalchemy import event
+
+    counter = QueryCounter()
+    with web.app.app_context():
+        engine = web.db.engine
+    event.listen(engine, 'after_cursor_execute', counter)
+
+    def run(client, path):
+        counter.count = 0
+        response = client.get(path)
+        return response, counter.count
+
+    yield run
+    event.remove(engine, 'after_cursor_execute', counter)
@@ -0,0 +1,17 @@
+import threading
+from unittest import mock
+
+import avatars
+
+
+def test_failed_upload_calls_on_error(tmp_path):
+    pipeline = avatars.AvatarPipeline(str(tmp_path), workers=1)
+    finished = threading.Event()
+    outcome = []
+    with mock.patch.object(avatars, 'render', side_effect=OSError('disk full')):
+        assert pipeline.submit(b'image', 'digest', lambda: outcome.append('done'),
+                               lambda: (outcome.append('error'), finished.set()))
+        assert finished.wait(5)
+    assert outcome == ['error']
+    assert pipeline.stats()['failed'] == 1
+    pipeline.executor.shutdown()
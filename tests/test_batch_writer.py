@@ -0,0 +1,29 @@
+import atexit
+from unittest import mock
+
+from batch_writer import BatchWriter
+
+
+def test_stopped_writer_rejects_records_until_restarted():
+    written = []
+    writer = BatchWriter(written.extend, interval=0.01)
+    assert writer.submit(1)
+    writer.stop()
+    assert written == [1]
+
+    assert not writer.submit(2)
+    assert writer.stats()['rejected'] == 1
+
+    writer.start()
+    assert writer.submit(3)
+    writer.stop()
+    assert written == [1, 3]
+
+
+def test_shutdown_hook_is_registered_once():
+    with mock.patch.object(atexit, 'register') as register:
+        writer = BatchWriter(lambda batch: None, interval=0.01)
+        for _ in range(3):
+            writer.start()
+            writer.stop()
+    assert register.call_count == 1
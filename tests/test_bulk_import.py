@@ -0,0 +1,45 @@
+import json
+
+
+def import_lines(web, lines):
+    with web.app.app_context():
+        user = web.User(username='me', player_id='P0001', password_hash='x')
+        web.db.session.add_all([user, web.Player(username='alice', score=0), web.Player(username='bob', score=0)])
+        web.db.session.commit()
+        user_id = user.id
+    client = web.app.test_client()
+    with client.session_transaction() as client_session:
+        client_session['user_id'] = user_id
+    body = '\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+    response = client.post('/api/sessions/bulk', data=body, content_type='application/x-ndjson')
+    assert response.status_code == 200
+    return client, response.get_json()
+
+
+def test_non_finite_amounts_are_rejected_per_row(web):
+    client, report = import_lines(web, [
+        {'date': '2024-01-01', 'buy_in_amount': 50, 'players': [{'player_id': 1, 'final_amount': 80}]},
+        '{"date": "2024-01-02", "buy_in_amount": 50, "players": [{"player_id": 1, "final_amount": NaN}]}',
+        {'date': '2024-01-03', 'buy_in_amount': 50, 'players': [{'player_id': 2, 'final_amount': 'inf'}]},
+        {'date': '2024-01-04', 'buy_in_amount': '-Infinity', 'players': [{'player_id': 2, 'final_amount': 10}]},
+        {'date': '2024-01-05', 'buy_in_amount': 50, 'players': [{'player_id': 2, 'final_amount': 45}]},
+    ])
+    assert (report['imported_sessions'], report['imported_results']) == (2, 2)
+    assert [error['line'] for error in report['errors']] == [2, 3, 4]
+    assert all(error['error'].startswith('Invalid') for error in report['errors'])
+
+    # Still valid JSON for every client
+    leaderboard = json.loads(client.get('/api/leaderboard').get_data(as_text=True))
+    assert sorted(entry['total_profit'] for entry in leaderboard) == [-5, 30]
+
+
+def test_duplicate_players_in_a_session_are_rejected(web):
+    client, report = import_lines(web, [
+        {'date': '2024-01-01', 'buy_in_amount': 50,
+         'players': [{'player_id': 1, 'final_amount': 45}, {'player_id': 1, 'final_amount': 45}]},
+        {'date': '2024-01-02', 'buy_in_amount': 50, 'players': [{'player_id': 1, 'final_amount': 45}]},
+    ])
+    assert report['errors'] == [{'line': 1, 'error': 'Duplicate player_id 1'}]
+    assert (report['imported_sessions'], report['imported_results']) == (1, 1)
+    entry, = client.get('/api/leaderboard').get_json()
+    assert (entry['total_profit'], entry['sessions']) == (-5, 1)
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+
+def test_results_event_goes_only_to_the_affected_player(web):
+    with web.app.app_context():
+        web.db.session.add_all([web.Player(username='alice', score=0), web.Player(username='bob', score=0)])
+        poker_session = web.PokerSession(date=datetime(2024, 1, 1), buy_in_amount=50)
+        web.db.session.add(poker_session)
+        web.db.session.commit()
+        session_id = poker_session.id
+
+    last_id = web.events.last_id
+    client = web.app.test_client()
+    response = client.post(f'/api/session/{session_id}/results', json={'player_id': 2, 'final_amount': 80})
+    assert response.status_code == 200
+
+    published = [event for event in web.events.events if event.id > last_id and event.type == 'results']
+    assert [event.user_id for event in published] == [2]
+
@@ -0,0 +1,24 @@
+def test_weak_etag_from_a_proxy_is_not_modified(web):
+    client = web.app.test_client()
+    response = client.get('/api/leaderboard')
+    etag = response.headers['ETag']
+    assert client.get('/api/leaderboard', headers={'If-None-Match': 'W/' + etag}).status_code == 304
+    assert client.get('/api/leaderboard', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_responses_validate_by_etag_only(web):
+    client = web.app.test_client()
+    response = client.get('/api/leaderboard')
+    assert 'Last-Modified' not in response.headers
+    response = client.get('/api/leaderboard', headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'})
+    assert response.status_code == 200
+
+
+def test_write_changes_the_etag(web):
+    client = web.app.test_client()
+    etag = client.get('/api/leaderboard').headers['ETag']
+    with web.app.app_context():
+        web.db.session.add(web.Player(username='alice', score=0))
+        web.db.session.commit()
+    response = client.get('/api/leaderboard', headers={'If-None-Match': etag})
+    assert response.status_code == 200
@@ -0,0 +1,17 @@
+import pytest
+
+STATS_ROUTES = ['/api/cache/stats', '/api/db/stats', '/api/events/stats', '/api/profile/avatar/stats',
+                '/debug/metrics']
+
+
+@pytest.mark.parametrize('path', STATS_ROUTES)
+def test_stats_are_served_locally(web, path):
+    assert web.app.test_client().get(path).status_code == 200
+
+
+@pytest.mark.parametrize('path', STATS_ROUTES)
+def test_stats_are_hidden_from_other_machines(web, path):
+    client = web.app.test_client()
+    assert client.get(path, environ_base={'REMOTE_ADDR': '203.0.113.9'}).status_code == 404
+    # A local reverse proxy forwarding someone else's request
+    assert client.get(path, headers={'X-Forwarded-For': '203.0.113.9'}).status_code == 404
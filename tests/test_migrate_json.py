@@ -0,0 +1,48 @@
+import json
+
+import binary_snapshot
+import poker_repository
+
+
+def write_history(path):
+    sessions = []
+    for day, results in enumerate([
+        [("Alice", 50, 120), ("Bob", 100, 0), ("Carol", 50, 80)],
+        [("Alice", 50, 0), ("Bob", 50, 140)],
+        [("Carol", 150, 60), ("Bob", 50, 0), ("Dave", 50, 0)],
+    ], start=1):
+        sessions.append({
+            "date": f"2024-03-{day:02d}",
+            "initial_buyin": 50,
+            "players": [{
+                "name": name,
+                "total_buyins": buyins,
+                "cash_out": cash_out,
+                "profit": cash_out - buyins
+            } for name, buyins, cash_out in results]
+        })
+    with open(path, "w") as f:
+        json.dump({"players": {}, "sessions": sessions}, f)
+
+
+def migrated_leaderboard(data_file, db_path):
+    sessions, results = poker_repository.migrate_json(str(data_file), str(db_path))
+    repo = poker_repository.SQLiteRepository(str(db_path))
+    repo.load()
+    try:
+        return sessions, results, repo.leaderboard()
+    finally:
+        repo.close()
+
+
+def test_json_and_pkr_migrate_to_the_same_database(tmp_path):
+    json_file = tmp_path / "poker_data.json"
+    pkr_file = tmp_path / "poker_data.pkr"
+    write_history(json_file)
+    binary_snapshot.convert(str(json_file), str(pkr_file))
+
+    from_json = migrated_leaderboard(json_file, tmp_path / "from_json.db")
+    from_pkr = migrated_leaderboard(pkr_file, tmp_path / "from_pkr.db")
+
+    assert from_json[:2] == (3, 8)
+    assert from_pkr == from_json
@@ -0,0 +1,31 @@
+import time
+
+import pytest
+
+from password_hasher import HasherBusy, PasswordHasher
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_timed_out_hashes_keep_their_slot_until_they_finish():
+    hasher = PasswordHasher(workers=1, max_pending=2, timeout=0.2)
+    try:
+        for _ in range(2):
+            with pytest.raises(HasherBusy):
+                hasher._run(sleep_for, 1)
+        # Both are still running or queued in the worker, so a third waits its turn
+        assert hasher.stats()['pending'] == 2
+        with pytest.raises(HasherBusy):
+            hasher._run(sleep_for, 0)
+        assert hasher.stats()['rejected'] == 1
+
+        deadline = time.monotonic() + 10
+        while hasher.stats()['pending'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert hasher._run(sleep_for, 0) == 0
+        assert hasher.stats()['pending'] == 0
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,62 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import poker_repository
+
+
+def aggregates(repo):
+    return (
+        repo.conn.execute("SELECT * FROM leaderboard_entry ORDER BY player_id").fetchall(),
+        repo.conn.execute("""SELECT player_id, day, sessions, winning_sessions, round(total_profit, 6),
+                                    best_profit, worst_profit, round(cumulative_profit, 6)
+                             FROM player_daily_rollup ORDER BY player_id, day""").fetchall()
+    )
+
+
+def test_cashouts_keep_aggregates_equal_to_a_rebuild(tmp_path):
+    repo = poker_repository.SQLiteRepository(str(tmp_path / "poker.db"))
+    repo.load()
+    names = ["alice", "bob", "carol"]
+    rng = random.Random(3)
+    keys = [repo.create_session(datetime(2024, 1, 1) + timedelta(days=rng.randrange(15), hours=rng.randrange(20)),
+                                50, names) for _ in range(40)]
+    # Cash-outs land in any order, and some players cash out again
+    for _ in range(150):
+        key, name = rng.choice(keys), rng.choice(names)
+        if rng.random() < 0.3:
+            repo.add_rebuy(key, name, 20)
+        repo.record_cashout(key, name, rng.choice([0, 10, 50, 80, 120, 200]))
+
+    incremental = aggregates(repo)
+    with repo.transaction():
+        repo.rebuild_aggregates()
+    assert aggregates(repo) == incremental
+    repo.close()
+
+
+def test_replacing_an_extreme_past_the_other_bound_rescans():
+    series = poker_repository.PlayerSeries()
+    series.add("s1", "2024-01-01", 100)
+    series.add("s2", "2024-01-02", -50)
+    # The best result is re-saved as a loss bigger than the worst
+    series.set_profit("s1", -60)
+    assert (series.best, series.worst, series.total) == (0.0, -60, -110)
+
+    series.set_profit("s1", 30)
+    series.set_profit("s2", 40)
+    assert (series.best, series.worst, series.total) == (40, 0.0, 70)
+
+
+def test_cashout_for_an_unknown_seat_raises_key_error(tmp_path):
+    repo = poker_repository.SQLiteRepository(str(tmp_path / "poker.db"))
+    repo.load()
+    key = repo.create_session(datetime(2024, 1, 1), 50, ["alice"])
+    for session_key, name in ((key, "bob"), (key + 1, "alice")):
+        with pytest.raises(KeyError):
+            repo.record_cashout(session_key, name, 80)
+    # The failed cash-outs left no transaction open behind them
+    repo.record_cashout(key, "alice", 80)
+    assert repo.conn.execute("SELECT total_profit FROM leaderboard_entry").fetchall() == [(30.0,)]
+    repo.close()
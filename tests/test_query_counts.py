@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+
+def add_sessions(web, player_id, count, start=0, span=None):
+    # Every other session gets a result; the rest are seats still in play
+    for i in range(start, start + count):
+        day = i % span if span else i
+        poker_session = web.PokerSession(date=datetime(2024, 1, 1) + timedelta(days=day), buy_in_amount=50)
+        web.db.session.add(poker_session)
+        web.db.session.flush()
+        web.db.session.add(web.SessionPlayer(session_id=poker_session.id, player_id=player_id))
+        if i % 2 == 0:
+            web.db.session.add(web.PlayerResult(session_id=poker_session.id, player_id=player_id,
+                                                final_amount=100 if i % 4 == 0 else 0))
+    web.rebuild_daily_rollups([player_id])
+    web.rebuild_leaderboard([player_id])
+    web.db.session.commit()
+
+
+def add_friends(web, user_id, count, start=0):
+    # Half of them accepted, the other half still asking
+    for i in range(start, start + count):
+        friend = web.User(username=f'friend{i}', player_id=f'F{i:04d}', password_hash='x')
+        web.db.session.add(friend)
+        web.db.session.flush()
+        if i % 2 == 0:
+            web.db.session.add(web.Friendship(user_id=user_id, friend_id=friend.id, status='accepted'))
+        else:
+            web.db.session.add(web.Friendship(user_id=friend.id, friend_id=user_id, status='pending'))
+    web.db.session.commit()
+
+
+def logged_in_client(web):
+    with web.app.app_context():
+        user = web.User(username='me', player_id='P0001', password_hash='x')
+        web.db.session.add_all([user, web.Player(username='me', score=0)])
+        web.db.session.commit()
+        user_id = user.id
+    client = web.app.test_client()
+    with client.session_transaction() as client_session:
+        client_session['user_id'] = user_id
+    # Warm the per-process user cache so every measured request starts alike
+    client.get('/api/auth/check')
+    return client
+
+
+def test_profile_stats_query_count_does_not_grow_with_sessions(web, count_queries):
+    client = logged_in_client(web)
+    with web.app.app_context():
+        add_sessions(web, 1, 4)
+    response, small = count_queries(client, '/api/profile/stats/1')
+    assert response.status_code == 200
+
+    with web.app.app_context():
+        add_sessions(web, 1, 60, start=4)
+    response, large = count_queries(client, '/api/profile/stats/1')
+    assert response.status_code == 200
+    assert small == large == 1
+
+    stats = response.get_json()
+    assert stats['total_sessions'] == 64
+    # Only the 32 sessions with a result count towards the win rate
+    assert stats['win_rate'] == 50
+
+
+def test_friend_lists_query_count_does_not_grow_with_friends(web, count_queries):
+    client = logged_in_client(web)
+    with web.app.app_context():
+        add_friends(web, 1, 4)
+    small = {path: count_queries(client, path)[1] for path in ('/api/friends', '/api/friends/pending')}
+
+    with web.app.app_context():
+        add_friends(web, 1, 60, start=4)
+    for path in ('/api/friends', '/api/friends/pending'):
+        response, large = count_queries(client, path)
+        assert response.status_code == 200
+        assert len(response.get_json()) == 32
+        assert large == small[path] == 1
+
+
+def test_auth_check_reads_the_user_once(web, count_queries):
+    client = logged_in_client(web)
+    with web.app.app_context():
+        add_friends(web, 1, 20)
+    web.user_cache.clear()
+    response, cold = count_queries(client, '/api/auth/check')
+    assert response.status_code == 200
+    response, warm = count_queries(client, '/api/auth/check')
+    assert response.get_json()['username'] == 'me'
+    assert (cold, warm) == (1, 0)
+
+
+def test_leaderboard_query_count_does_not_grow_with_sessions(web, count_queries):
+    client = web.app.test_client()
+    with web.app.app_context():
+        web.db.session.add_all([web.Player(username=f'player{i}', score=0) for i in range(12)])
+        web.db.session.commit()
+        for player_id in range(1, 13):
+            add_sessions(web, player_id, 4)
+    response, small = count_queries(client, '/api/leaderboard')
+    assert response.status_code == 200
+
+    with web.app.app_context():
+        for player_id in range(1, 13):
+            add_sessions(web, player_id, 30, start=4)
+    response, large = count_queries(client, '/api/leaderboard')
+    assert response.status_code == 200
+    assert len(response.get_json()) == 10
+    assert small == large == 1
+
+
+def test_dashboard_query_count_does_not_grow_with_sessions(web, count_queries):
+    client = logged_in_client(web)
+    # Same span of days both times, so the chart keeps its resolution
+    with web.app.app_context():
+        add_sessions(web, 1, 4, span=5)
+    response, small = count_queries(client, '/api/dashboard')
+    assert response.status_code == 200
+
+    with web.app.app_context():
+        add_sessions(web, 1, 60, start=4, span=5)
+    response, large = count_queries(client, '/api/dashboard')
+    assert response.status_code == 200
+    assert response.get_json()['total_sessions'] == 32
+    assert small == large == 2
@@ -0,0 +1,86 @@
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+# "SCAN <table>" with no index after it means SQLite reads every row
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+HOT_ROUTES = [
+    ('GET', '/api/leaderboard'),
+    ('GET', '/api/sessions?limit=5'),
+    ('GET', '/api/sessions?limit=5&cursor={sessions_cursor}'),
+    ('GET', '/api/players?limit=5&cursor={players_cursor}'),
+    ('GET', '/api/session/1/results'),
+    ('GET', '/api/profile/stats/{player_id}'),
+    ('GET', '/api/dashboard?days=30'),
+    ('GET', '/api/friends'),
+    ('GET', '/api/friends/pending'),
+    ('GET', '/api/users/search?query=us'),
+    ('GET', '/api/users/search?query=user4'),
+    ('GET', '/api/auth/check'),
+    ('POST', '/api/friends/add'),
+]
+
+
+def seed(web):
+    users = [web.User(username=f'user{i}', player_id=f'P{i:04d}', password_hash='x') for i in range(50)]
+    players = [web.Player(username=f'player{i}') for i in range(20)]
+    web.db.session.add_all(users + players)
+    web.db.session.flush()
+
+    for i in range(40):
+        poker_session = web.PokerSession(date=datetime(2024, 1, 1) + timedelta(days=i), buy_in_amount=20)
+        web.db.session.add(poker_session)
+        web.db.session.flush()
+        for player in players[i % 5::5]:
+            web.db.session.add(web.SessionPlayer(session_id=poker_session.id, player_id=player.id))
+            web.db.session.add(web.PlayerResult(session_id=poker_session.id, player_id=player.id,
+                                                final_amount=i % 35))
+
+    for user in users[1:30]:
+        web.db.session.add(web.Friendship(user_id=users[0].id, friend_id=user.id, status='accepted'))
+    for user in users[30:40]:
+        web.db.session.add(web.Friendship(user_id=user.id, friend_id=users[0].id))
+    web.db.session.commit()
+    return users[0].id, players[0].id
+
+
+@pytest.mark.parametrize('method,path', HOT_ROUTES)
+def test_hot_queries_use_an_index(web, method, path):
+    with web.app.app_context():
+        user_id, player_id = seed(web)
+        client = web.app.test_client()
+        with client.session_transaction() as client_session:
+            client_session['user_id'] = user_id
+        path = path.format(
+            sessions_cursor=client.get('/api/sessions?limit=5').headers['X-Next-Cursor'],
+            players_cursor=client.get('/api/players?limit=5').headers['X-Next-Cursor'],
+            player_id=player_id
+        )
+
+        # Make the user lookup hit the database too
+        web.user_cache.clear()
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        event.listen(web.db.engine, 'before_cursor_execute', capture)
+        try:
+            if method == 'POST':
+                response = client.post(path, json={'player_id': 'P0049'})
+            else:
+                response = client.get(path)
+        finally:
+            event.remove(web.db.engine, 'before_cursor_execute', capture)
+        assert response.status_code < 400
+        assert statements
+
+        scans = []
+        for statement, parameters in statements:
+            plan = web.db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+            scans += [f"{row[3]}: {' '.join(statement.split())}" for row in plan if FULL_SCAN.match(row[3])]
+        assert scans == []
@@ -0,0 +1,25 @@
+def search(web, usernames, query):
+    with web.app.app_context():
+        me = web.User(username='me', player_id='P0000', password_hash='x')
+        web.db.session.add(me)
+        web.db.session.add_all([web.User(username=name, player_id=f'P{i:04d}', password_hash='x')
+                                for i, name in enumerate(usernames, 1)])
+        web.db.session.commit()
+        user_id = me.id
+    web.short_prefix_matches.cache_clear()
+    client = web.app.test_client()
+    with client.session_transaction() as client_session:
+        client_session['user_id'] = user_id
+    response = client.get('/api/users/search', query_string={'query': query})
+    assert response.status_code == 200
+    return [user['username'] for user in response.get_json()]
+
+
+def test_non_ascii_prefix_matches(web):
+    assert search(web, ['Émile', 'Zoë', 'Bob'], 'Ém') == ['Émile']
+
+
+def test_substring_matches_are_ranked_before_the_limit(web):
+    # The closest (shortest) matches come last in rowid order
+    names = [f'player_xyz_with_a_long_name_{i}' for i in range(300)] + ['axyz', 'bxyz']
+    assert search(web, names, 'xyz')[:2] == ['axyz', 'bxyz']
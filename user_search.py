@@ -0,0 +1,73 @@
+"""Indexed username search for the friend search box.
+
+Prefix matches come from an expression index on lower(username) and are
+ranked first. Substring matches come from an external-content FTS5
+trigram table kept in sync with the ``user`` table by triggers. Trigrams
+need at least three characters, so shorter queries are prefix-only.
+"""
+
+MIN_MATCH_LENGTH = 3
+
+CREATE_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_user_username_lower ON user (lower(username))",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS user_search USING fts5(
+        username, content='user', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS user_search_ai AFTER INSERT ON user BEGIN
+        INSERT INTO user_search(rowid, username) VALUES (new.id, new.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_search_ad AFTER DELETE ON user BEGIN
+        INSERT INTO user_search(user_search, rowid, username) VALUES ('delete', old.id, old.username);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS user_search_au AFTER UPDATE OF username ON user BEGIN
+        INSERT INTO user_search(user_search, rowid, username) VALUES ('delete', old.id, old.username);
+        INSERT INTO user_search(rowid, username) VALUES (new.id, new.username);
+    END""",
+]
+
+DROP_DDL = [
+    "DROP TRIGGER IF EXISTS user_search_au",
+    "DROP TRIGGER IF EXISTS user_search_ad",
+    "DROP TRIGGER IF EXISTS user_search_ai",
+    "DROP TABLE IF EXISTS user_search",
+    "DROP INDEX IF EXISTS ix_user_username_lower",
+]
+
+REBUILD_SQL = "INSERT INTO user_search(user_search) VALUES ('rebuild')"
+
+# Range scan over ix_user_username_lower, so it stops after :limit rows
+PREFIX_SQL = """
+    SELECT id FROM user
+    WHERE lower(username) >= :low AND lower(username) < :high
+    ORDER BY lower(username)
+    LIMIT :limit
+"""
+
+# Shorter names are the closer matches. Every match is ranked before the
+# limit applies; SQLite keeps only the best :limit rows while it sorts.
+MATCH_SQL = """
+    SELECT rowid FROM user_search
+    WHERE user_search MATCH :match AND rowid != :exclude
+    ORDER BY length(username), username
+    LIMIT :limit
+"""
+
+
+def match_expression(query):
+    # Quote the whole query as one FTS5 string so user input can't inject
+    # query syntax (AND, NEAR, column filters, ...)
+    return '"%s"' % query.replace('"', '""')
+
+
+ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def ascii_lower(text):
+    # SQLite's lower() only folds ASCII; str.lower() would fold more and
+    # then never match the index
+    return text.translate(ASCII_LOWER)
+
+
+def prefix_range(query):
+    low = ascii_lower(query)
+    return low, low + chr(0x10ffff)